@@ -10,6 +10,8 @@ from pymongo.collection import Collection
 _client: MongoClient | None = None
 _db_name: str | None = None
 _payments_coll_name: str | None = None
+_soft_caps_indexed = False
+_idempotency_indexed = False
 
 
 def get_mongo_client() -> MongoClient:
@@ -59,3 +61,33 @@ def get_payments_collection() -> Collection:
     coll.create_index("photonpay_id", unique=True)
     coll.create_index("customer_id")
     return coll
+
+
+def get_soft_caps_collection() -> Collection:
+    """
+    Collection holding each Google Ads customer's soft cap (one document per customer_id).
+    The index is created on first use only, since every pause check reads this collection.
+    """
+    global _soft_caps_indexed
+    coll = get_mongo_db()[os.getenv("MONGO_SOFT_CAPS_COLL") or "soft_caps"]
+
+    if not _soft_caps_indexed:
+        coll.create_index("customer_id", unique=True)
+        _soft_caps_indexed = True
+    return coll
+
+
+def get_idempotency_collection(ttl_seconds: int) -> Collection:
+    """
+    Collection of idempotency records for the billing write endpoints (one document per key).
+    Shared by every worker process: "key" is unique, so only one of them can claim a key,
+    and a TTL index on "created_at" drops records after `ttl_seconds`.
+    """
+    global _idempotency_indexed
+    coll = get_mongo_db()[os.getenv("MONGO_IDEMPOTENCY_COLL") or "idempotency_keys"]
+
+    if not _idempotency_indexed:
+        coll.create_index("key", unique=True)
+        coll.create_index("created_at", expireAfterSeconds=ttl_seconds)
+        _idempotency_indexed = True
+    return coll
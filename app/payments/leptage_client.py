@@ -176,13 +176,12 @@ class LeptageClient:
         query_string = "&".join(f"{k}={v}" for k, v in params.items())
         url = f"{url}?{query_string}"
 
-     print(f"[DEBUG] Calling: {url}")
-     print(f"[DEBUG] Headers: {headers}")
+     current_app.logger.debug("[LEPTAGE] Calling: %s", url)
+     current_app.logger.debug("[LEPTAGE] Headers: %s", headers)
 
      resp = requests.get(url, headers=headers, timeout=15)
      if resp.status_code >= 400:
-        print(f"[ERROR] Status: {resp.status_code}")
-        print(f"[ERROR] Body: {resp.text}")
+        current_app.logger.error("[LEPTAGE] Status: %s Body: %s", resp.status_code, resp.text)
      resp.raise_for_status()
      return resp.json()
 
@@ -33,6 +33,7 @@ Webhook Authentication:
 
 import hashlib
 import json
+import logging
 import time
 import os
 import binascii
@@ -42,6 +43,8 @@ from typing import Dict, Any, Optional
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import ec
 
+log = logging.getLogger(__name__)
+
 
 class LeptageRequestSigner:
     """
@@ -309,16 +312,16 @@ def get_signed_headers_v2(
         else:
             # POST: compact JSON with sorted keys
             params_str = json.dumps(body_or_params, separators=(",", ":"), sort_keys=True)
-            print(f"[DEBUG] Compact JSON body: {params_str}")
+            log.debug("Compact JSON body: %s", params_str)
 
     sign_str = f"{method_up}{url}{nonce_ms}{params_str}"
-    print(f"[DEBUG] String to sign: {sign_str}")
+    log.debug("String to sign: %s", sign_str)
 
     # Sign with ECDSA P-256 + SHA256, DER hex
     signer = LeptageRequestSigner(api_key, api_secret)
     signature_hex = signer._sign_bytes(sign_str.encode("utf-8"))
 
-    print(f"[DEBUG] Signature (hex): {signature_hex}")
+    log.debug("Signature (hex): %s", signature_hex)
 
     return {
         "X-API-KEY": api_key,
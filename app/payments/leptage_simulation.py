@@ -82,9 +82,9 @@ class LeptageSimulator:
 
         full_url = base_no_openapi + path
 
-        print(f"[LEPTAGE MOCK] Calling: {full_url}")
-        print(f"[LEPTAGE MOCK] Payload: {payload}")
-        print(f"[LEPTAGE MOCK] Headers: {headers}")
+        current_app.logger.debug("[LEPTAGE MOCK] Calling: %s", full_url)
+        current_app.logger.debug("[LEPTAGE MOCK] Payload: %s", payload)
+        current_app.logger.debug("[LEPTAGE MOCK] Headers: %s", headers)
 
         resp = requests.post(
             full_url,
@@ -94,11 +94,13 @@ class LeptageSimulator:
         )
 
         if resp.status_code >= 400:
-            print(f"[ERROR] Status: {resp.status_code}")
-            print(f"[ERROR] Response body: {resp.text}")
+            current_app.logger.error(
+                "[LEPTAGE MOCK] Status: %s Response body: %s", resp.status_code, resp.text
+            )
         else:
-            print(f"[SUCCESS] Status: {resp.status_code}")
-            print(f"[SUCCESS] Response body: {resp.text}")
+            current_app.logger.debug(
+                "[LEPTAGE MOCK] Status: %s Response body: %s", resp.status_code, resp.text
+            )
 
         resp.raise_for_status()
         return resp.json()
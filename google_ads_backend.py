@@ -1,30 +1,123 @@
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from google.ads.googleads import client as googleads_client
 from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
 import time
+import random
+import contextvars
+import functools
+import hashlib
+import gzip
+import itertools
 import socket
+import grpc
 import re
 import os
-from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from operator import attrgetter
+from typing import List, Optional, Tuple
 import logging
+import logging.handlers
+import queue
 from pathlib import Path
 
 
+import orjson
+import pymongo
 import yaml
+from cachetools import TTLCache
 from pathlib import Path
 from app.payments import payments_bp
+from app.mongo_client import get_idempotency_collection, get_soft_caps_collection
 import sys
+import threading
+import uuid
+import atexit
+
+# Endpoint loggers print as "[TAG] message"; the tag is the logger name.
+# Request threads only enqueue records; a listener thread does the stdout
+# writes, so handlers never wait on the stream lock.
+_endpoint_log_stream = logging.StreamHandler(sys.stdout)
+_endpoint_log_stream.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
+_endpoint_log_queue = queue.SimpleQueue()
+_endpoint_log_handler = logging.handlers.QueueHandler(_endpoint_log_queue)
+_endpoint_log_listener = logging.handlers.QueueListener(_endpoint_log_queue, _endpoint_log_stream)
+_endpoint_log_listener.start()
+atexit.register(_endpoint_log_listener.stop)
+
+
+def _tagged_logger(tag):
+    """Return a logger named `tag`, levelled by LOG_LEVEL (default INFO)."""
+    log = logging.getLogger(tag)
+    if _endpoint_log_handler not in log.handlers:
+        log.addHandler(_endpoint_log_handler)
+    log.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    log.propagate = False
+    return log
+
+
+# The library logs every RPC: a summary line at INFO, full request and
+# response payloads at DEBUG. Route it through the same queue and level.
+logger = _tagged_logger('google.ads.googleads.client')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Parse request bodies and serialize jsonify() responses with orjson.
+
+    Types orjson does not handle natively (Decimal, UUID, __html__ objects)
+    fall back to Flask's default() so responses look the same as before.
+    """
+
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
 
-logger = logging.getLogger('google.ads.googleads.client')
-logger.addHandler(logging.StreamHandler(sys.stdout))
-logger.setLevel(logging.DEBUG)  # or INFO
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype,
+        )
 
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 CORS(app)
 
+# JSON bodies at least this large are gzipped for clients that accept it;
+# smaller ones are not worth the CPU or the header overhead.
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+
+
+@app.after_request
+def gzip_json_response(response):
+    if response.mimetype != "application/json" or response.direct_passthrough:
+        return response
+    response.vary.add("Accept-Encoding")
+    if (
+        "Content-Encoding" in response.headers
+        or not request.accept_encodings["gzip"]
+        or (response.content_length or 0) < GZIP_MIN_SIZE
+    ):
+        return response
+    response.set_data(gzip.compress(response.get_data(), compresslevel=GZIP_LEVEL))
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
 def load_leptage_config() -> None:
     """
     Load config/leptage.yaml into app.config["LEPTAGE_CONFIG"].
@@ -33,7 +126,7 @@ def load_leptage_config() -> None:
     config_path = root / "config" / "leptage.yaml"
 
     if not config_path.exists():
-        print(f"[WARN] Leptage config file not found: {config_path}")
+        _tagged_logger("LEPTAGE").warning("Config file not found: %s", config_path)
         app.config["LEPTAGE_CONFIG"] = {}
         return
 
@@ -51,27 +144,622 @@ app.register_blueprint(payments_bp)
 
 GOOGLE_ADS_CONFIG_PATH = os.getenv("GOOGLE_ADS_CONFIG_PATH", "google-ads.yaml")
 
+# Keep idle gRPC channels alive between bursts of requests instead of letting
+# them drop and paying for a new TLS handshake on the next call.
+GRPC_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.keepalive_permit_without_calls", 1),
+]
+
+# Each get_service() call opens its own channel, so keeping a few stubs per
+# service and handing them out round-robin spreads concurrent RPCs over
+# several HTTP/2 connections instead of queueing them on one.
+GRPC_CHANNEL_POOL_SIZE = int(os.getenv("GRPC_CHANNEL_POOL_SIZE", "4"))
+
+
+def _apply_grpc_channel_options():
+    # get_service() builds every channel from the library's module-level
+    # option list; there is no per-client hook for channel options.
+    options = googleads_client._GRPC_CHANNEL_OPTIONS
+    for option in GRPC_CHANNEL_OPTIONS:
+        if option not in options:
+            options.append(option)
+
+
 def load_google_ads_client():
     """Load Google Ads client and derive MCC customer ID from config."""
     client = GoogleAdsClient.load_from_storage(GOOGLE_ADS_CONFIG_PATH)
+    _apply_grpc_channel_options()
     login_cid = client.login_customer_id
     if login_cid is None:
         raise ValueError("login_customer_id is not set in google-ads.yaml")
     mcc_id = str(login_cid).replace("-", "").strip()
     return client, mcc_id
 
+# One client per process: building it parses the YAML, sets up OAuth
+# credentials and (per get_service call) opens a gRPC channel. It is
+# recycled every GOOGLE_ADS_CLIENT_TTL seconds so a long-lived client
+# cannot get stuck in a bad state, and reloaded sooner if google-ads.yaml
+# changes on disk (checked at most every GOOGLE_ADS_CONFIG_CHECK_INTERVAL
+# seconds) so rotated credentials are picked up without a restart.
+GOOGLE_ADS_CLIENT_TTL = 30 * 60
+GOOGLE_ADS_CONFIG_CHECK_INTERVAL = 5
+
+_client_lock = threading.Lock()
+_ads_client = None  # (client, mcc_id)
+_ads_client_loaded_at = 0.0
+_ads_config_mtime = None
+_ads_config_checked_at = 0.0
+_ads_services = {}  # service name -> (client the stubs came from, round-robin cycle of stubs)
+
+
+def _config_mtime():
+    try:
+        return os.stat(GOOGLE_ADS_CONFIG_PATH).st_mtime
+    except OSError:
+        return None
+
+
+def _get_ads_client_locked():
+    """get_ads_client() for a caller that already holds _client_lock."""
+    global _ads_client, _ads_client_loaded_at, _ads_config_mtime, _ads_config_checked_at
+    now = time.monotonic()
+    stale = _ads_client is None or now - _ads_client_loaded_at > GOOGLE_ADS_CLIENT_TTL
+    if not stale and now - _ads_config_checked_at > GOOGLE_ADS_CONFIG_CHECK_INTERVAL:
+        _ads_config_checked_at = now
+        stale = _config_mtime() != _ads_config_mtime
+    if stale:
+        mtime = _config_mtime()
+        _ads_client = load_google_ads_client()
+        _ads_client_loaded_at = _ads_config_checked_at = now
+        _ads_config_mtime = mtime
+        _ads_services.clear()
+    return _ads_client
+
+
+def get_ads_client():
+    """Return the shared (client, mcc_id), loading it on first use, after the TTL or a YAML change."""
+    with _client_lock:
+        return _get_ads_client_locked()
+
+
+def get_ads_service(name):
+    """Return a cached service stub for the shared client, round-robin over the channel pool."""
+    # The client is read and the pool built under one lock hold, so a
+    # reset or reload cannot slip in between and leave stubs of the old
+    # client cached.
+    with _client_lock:
+        client, _ = _get_ads_client_locked()
+        pool_client, pool = _ads_services.get(name, (None, None))
+        if pool_client is not client:
+            stubs = [client.get_service(name) for _ in range(max(1, GRPC_CHANNEL_POOL_SIZE))]
+            pool = itertools.cycle(stubs)
+            _ads_services[name] = (client, pool)
+        return next(pool)
+
+
+def reset_ads_client():
+    """Drop the shared client so the next call rebuilds it (e.g. after an auth failure)."""
+    global _ads_client
+    with _client_lock:
+        _ads_client = None
+        _ads_services.clear()
+
+
+# Transport failures worth retrying: matched by type or gRPC status first,
+# with one compiled pattern over the message for wrapped exceptions.
+_NETWORK_EXC_TYPES = (socket.gaierror, ConnectionError, TimeoutError)
+_RETRYABLE_GRPC_CODES = frozenset({grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED})
+_NETWORK_ERROR_RE = re.compile(
+    "getaddrinfo failed|failed to resolve|connection refused|connection reset"
+    "|max retries exceeded|transporterror|connectionerror",
+    re.IGNORECASE,
+)
+
+
+class MutateOutcomeUnknown(Exception):
+    """A non-idempotent mutate failed in transit and may or may not have been applied."""
+
+
+class MutateBudgetExhausted(Exception):
+    """Too little of the retry_rpc budget is left to send a mutate; nothing was sent."""
+
+
 def is_network_error(e):
-    msg = str(e).lower()
-    return (
-        "getaddrinfo failed" in msg or
-        "failed to resolve" in msg or
-        "connection refused" in msg or
-        "connection reset" in msg or
-        "max retries exceeded" in msg or
-        "transporterror" in msg or
-        "connectionerror" in msg or
-        isinstance(e, socket.gaierror)
-    )
+    if isinstance(e, (MutateOutcomeUnknown, MutateBudgetExhausted)):
+        return False
+    if isinstance(e, _NETWORK_EXC_TYPES):
+        return True
+    if isinstance(e, GoogleAdsException):
+        # The API answered: INVALID_CUSTOMER_ID and friends are permanent, so
+        # only the status decides. Matching the message would let a field
+        # value echoed back in the failure trigger a retry.
+        return e.error.code() in _RETRYABLE_GRPC_CODES
+    if isinstance(e, grpc.RpcError) and callable(getattr(e, "code", None)):
+        return e.code() in _RETRYABLE_GRPC_CODES
+    return _NETWORK_ERROR_RE.search(str(e)) is not None
+
+
+def is_auth_error(e):
+    """True for a gRPC UNAUTHENTICATED status, raw or wrapped in GoogleAdsException."""
+    call = getattr(e, "error", e)  # GoogleAdsException keeps the grpc.Call on .error
+    if isinstance(call, grpc.RpcError) and callable(getattr(call, "code", None)):
+        return call.code() == grpc.StatusCode.UNAUTHENTICATED
+    return False
+
+
+# RESOURCE_EXHAUSTED means the MCC's quota is spent: retrying here only
+# burns more of it, so callers get a 429 and come back after Retry-After
+# (or move on to another customer) instead.
+RATE_LIMIT_RETRY_AFTER = 60
+
+
+def is_rate_limited(e):
+    """True for a gRPC RESOURCE_EXHAUSTED status, raw or wrapped in GoogleAdsException."""
+    call = getattr(e, "error", e)
+    if isinstance(call, grpc.RpcError) and callable(getattr(call, "code", None)):
+        return call.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+    return False
+
+
+def rate_limited_response(e):
+    """A 429 for a rate-limited call; Retry-After uses the API's retry_delay when it sends one."""
+    retry_after = RATE_LIMIT_RETRY_AFTER
+    failure = getattr(e, "failure", None)
+    if failure is not None:
+        delays = [err._pb.details.quota_error_details.retry_delay.seconds for err in failure.errors]
+        retry_after = max(delays + [0]) or retry_after
+    response = jsonify({
+        "success": False,
+        "rate_limited": True,
+        "retry_after": retry_after,
+        "errors": ["Google Ads API rate limit reached. Please retry later.", str(e)],
+    })
+    response.headers["Retry-After"] = str(retry_after)
+    return response, 429
+
+
+def error_response(e, body, status):
+    """
+    The response for an endpoint's error path: jsonify(body) with `status`,
+    unless `e` is a rate limit, which always becomes rate_limited_response(e),
+    or a mutate refused for lack of time, which is a 503 (safe to retry).
+    """
+    if is_rate_limited(e):
+        return rate_limited_response(e)
+    if isinstance(e, MutateBudgetExhausted):
+        return jsonify(body), 503
+    return jsonify(body), status
+
+
+# gRPC deadlines (seconds). Every RPC passes timeout=rpc_timeout(...) (reads)
+# or mutate_timeout() (writes), so a hung stream fails with
+# DEADLINE_EXCEEDED instead of holding a worker. Inside retry_rpc all
+# attempts share one RPC_DEADLINE budget: each call gets the smaller of its
+# own limit and what is left of that budget. A mutate is not sent at all
+# with less than MUTATE_MIN_TIMEOUT left: a deadline that short would
+# expire after the request went out and turn into an unknown outcome.
+GAQL_TIMEOUT = float(os.getenv("GAQL_TIMEOUT", "10"))
+MUTATE_TIMEOUT = float(os.getenv("MUTATE_TIMEOUT", "30"))
+MUTATE_MIN_TIMEOUT = float(os.getenv("MUTATE_MIN_TIMEOUT", "10"))
+RPC_DEADLINE = float(os.getenv("RPC_DEADLINE", "60"))
+
+_rpc_deadline = contextvars.ContextVar("rpc_deadline", default=None)
+
+
+def rpc_timeout(limit):
+    """Timeout for the next RPC: `limit`, cut to the time left in the current retry_rpc budget."""
+    deadline = _rpc_deadline.get()
+    if deadline is None:
+        return limit
+    return max(0.1, min(limit, deadline - time.monotonic()))
+
+
+def mutate_timeout():
+    """
+    Timeout for the next mutate: MUTATE_TIMEOUT, cut to the time left in the
+    current retry_rpc budget. Raises MutateBudgetExhausted, before anything
+    is sent, when less than MUTATE_MIN_TIMEOUT is left.
+    """
+    deadline = _rpc_deadline.get()
+    if deadline is None:
+        return MUTATE_TIMEOUT
+    remaining = deadline - time.monotonic()
+    if remaining < MUTATE_MIN_TIMEOUT:
+        raise MutateBudgetExhausted(
+            "Not enough time left in this request to send the change safely; nothing was sent. Please retry."
+        )
+    return min(MUTATE_TIMEOUT, remaining)
+
+
+def retry_rpc(fn, max_attempts=4, base=0.5):
+    """
+    Call fn(), retrying network errors with exponential backoff and full jitter.
+
+    Sleeps uniform(0, base * 2**attempt) between attempts and reuses the
+    shared client: gRPC channels reconnect by themselves, and rebuilding
+    would drop every pooled channel under concurrent requests too. Only a
+    first UNAUTHENTICATED failure rebuilds the client (fresh OAuth
+    credentials from google-ads.yaml) and retries at once.
+    All attempts share one RPC_DEADLINE budget; no retry starts once it
+    is spent. Other errors, and the last network error, are re-raised.
+    """
+    deadline = _rpc_deadline.get()
+    token = None
+    if deadline is None:
+        deadline = time.monotonic() + RPC_DEADLINE
+        token = _rpc_deadline.set(deadline)
+    try:
+        for attempt in range(max_attempts):
+            try:
+                return fn()
+            except Exception as e:
+                if attempt == 0 and is_auth_error(e):
+                    reset_ads_client()
+                    continue
+                if not is_network_error(e) or attempt == max_attempts - 1:
+                    raise
+                delay = random.uniform(0, base * 2 ** attempt)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+    finally:
+        if token is not None:
+            _rpc_deadline.reset(token)
+
+
+def mutate_once(fn, *args, **kwargs):
+    """
+    Send a mutate that must not be replayed (creates, proposals, invitations).
+
+    Call it inside a retry_rpc'd function: the reads before it stay
+    retryable, but a transport failure on the mutate becomes
+    MutateOutcomeUnknown, which retry_rpc re-raises instead of running the
+    whole call (and the mutate) again. gRPC reports DNS and connect
+    failures as UNAVAILABLE just like a lost response, so they count too.
+    """
+    try:
+        return fn(*args, **kwargs)
+    except Exception as e:
+        if not is_network_error(e):
+            raise
+        raise MutateOutcomeUnknown(
+            "The change may have been sent but no response arrived, so it may already have been applied. "
+            f"Check the account before retrying. ({e})"
+        ) from e
+
+
+# Fan-out pool for independent GAQL reads within one request.
+_EXEC = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gaql")
+
+
+def _submit(fn, *args):
+    """_EXEC.submit that carries the caller's context, so pool reads share its RPC deadline."""
+    return _EXEC.submit(contextvars.copy_context().run, fn, *args)
+
+# Caps GAQL reads in flight across all request and pool threads, so a burst
+# of requests queues here instead of piling streams onto the channels.
+MAX_INFLIGHT_RPCS = int(os.getenv("MAX_INFLIGHT_RPCS", "64"))
+_rpc_slots = threading.BoundedSemaphore(MAX_INFLIGHT_RPCS)
+
+
+def _search_all(customer_id, query):
+    """Run a GAQL search_stream and materialize its rows (safe to run on _EXEC)."""
+    ga_service = get_ads_service("GoogleAdsService")
+    with _rpc_slots:
+        stream = ga_service.search_stream(customer_id=customer_id, query=query, timeout=rpc_timeout(GAQL_TIMEOUT))
+        return [row for batch in stream for row in batch.results]
+
+
+def _first_row(customer_id, query):
+    """Return the first row of a GAQL search_stream, or None; pair with LIMIT 1."""
+    ga_service = get_ads_service("GoogleAdsService")
+    with _rpc_slots:
+        for batch in ga_service.search_stream(
+            customer_id=customer_id, query=query, timeout=rpc_timeout(GAQL_TIMEOUT)
+        ):
+            for row in batch.results:
+                return row
+        return None
+
+
+def _parse_customer_id(value):
+    """
+    Return `value` as a canonical customer id string, or None if it is not one.
+
+    Accepts ASCII digits only (str.isdigit alone also admits e.g. "²" or
+    Arabic-Indic digits, which the API rejects) and drops leading zeros, so
+    "0123" and "123" share cache entries.
+    """
+    value = str(value or "").strip()
+    if not (value.isascii() and value.isdigit()):
+        return None
+    customer_id = int(value)
+    return str(customer_id) if customer_id else None
+
+
+_ISO_UTC_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+# (epoch second, formatted string) of the last _now_iso() call. Timestamps
+# have one-second resolution, so every call within the same second reuses
+# the string; a racing thread at worst formats the same value twice.
+_iso_now_cache = (None, "")
+
+
+def _now_iso() -> str:
+    """UTC now as ISO-8601 with a Z suffix, formatted at most once per second."""
+    global _iso_now_cache
+    now = int(time.time())
+    second, formatted = _iso_now_cache
+    if second != now:
+        formatted = time.strftime(_ISO_UTC_FORMAT, time.gmtime(now))
+        _iso_now_cache = (now, formatted)
+    return formatted
+
+
+# client.get_type() and client.enums.X search the API modules on every
+# call. Message classes and enums are looked up once and reused; types
+# are still instantiated fresh since callers mutate them.
+_TYPE_CLASSES = {}
+_ENUMS = {}
+# enum name -> {int value: member name}, filled lazily on first use
+_ENUM_NAMES = {}
+
+
+def _get_type(client, name):
+    """Return a new, empty instance of client.get_type(name)."""
+    cls = _TYPE_CLASSES.get(name)
+    if cls is None:
+        cls = _TYPE_CLASSES[name] = type(client.get_type(name))
+    return cls()
+
+
+def _get_enum(client, name):
+    """Return the cached enum class for client.enums.<name>."""
+    enum = _ENUMS.get(name)
+    if enum is None:
+        enum = _ENUMS[name] = getattr(client.enums, name)
+    return enum
+
+
+def _enum_names(client, enum_name):
+    """Return a cached {int: name} map for client.enums.<enum_name>."""
+    names = _ENUM_NAMES.get(enum_name)
+    if names is None:
+        names = {member.value: member.name for member in _get_enum(client, enum_name)}
+        _ENUM_NAMES[enum_name] = names
+    return names
+
+
+# Short-lived caches for the spend/budget reads that dashboards poll.
+SPEND_CACHE_TTL = 30
+PAUSE_METRICS_CACHE_TTL = 10
+# 200 response bodies of the read-only reporting endpoints (@cached_read).
+READ_CACHE_TTL = 120
+# An account's currency is fixed at creation, so it can be kept much longer.
+CURRENCY_CACHE_TTL = 24 * 60 * 60
+# Billing write responses (successes and unknown outcomes), replayed for a repeated Idempotency-Key.
+# They live in Mongo; _idempotent_responses only spares repeat lookups of answered keys.
+IDEMPOTENCY_TTL = 60 * 60
+
+_cache_lock = threading.Lock()
+_spend_cache = TTLCache(maxsize=4096, ttl=SPEND_CACHE_TTL)
+_pause_metrics_cache = TTLCache(maxsize=4096, ttl=PAUSE_METRICS_CACHE_TTL)
+_currency_cache = TTLCache(maxsize=4096, ttl=CURRENCY_CACHE_TTL)
+_read_cache = TTLCache(maxsize=4096, ttl=READ_CACHE_TTL)
+_idempotent_responses = TTLCache(maxsize=10_000, ttl=IDEMPOTENCY_TTL)
+
+
+def _cache_get(cache, key):
+    with _cache_lock:
+        return cache.get(key)
+
+
+def _cache_put(cache, key, value):
+    with _cache_lock:
+        cache[key] = value
+
+
+def invalidate_customer_caches(customer_id, mcc_level=False):
+    """
+    Drop every cached read for `customer_id`; call after a successful write.
+
+    mcc_level=True also drops reads not tied to one customer (e.g. the
+    linked-accounts list), for writes that change the MCC's account set.
+    """
+    stale_ids = (customer_id, "") if mcc_level else (customer_id,)
+    with _cache_lock:
+        for cache in (_spend_cache, _pause_metrics_cache):
+            cache.pop(customer_id, None)
+        for key in [key for key in _read_cache if key[1] in stale_ids]:
+            _read_cache.pop(key, None)
+
+
+def cached_read(view):
+    """
+    Serve a GET endpoint's 200 responses from _read_cache.
+
+    Keyed by (path, customer_id) and kept for READ_CACHE_TTL seconds;
+    ?refresh=1 bypasses the cache. Responses carry a matching Cache-Control.
+    Like /client-spend-status, hits are flagged with "cached": true and get
+    a fresh "timestamp" when the body has one.
+    """
+    cache_control = f"private, max-age={READ_CACHE_TTL}"
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.path, _parse_customer_id(request.args.get("customer_id")) or "")
+        if request.args.get("refresh") != "1":
+            cached = _cache_get(_read_cache, key)
+            if cached is not None:
+                payload = {**cached, "cached": True}
+                if "timestamp" in cached:
+                    payload["timestamp"] = _now_iso()
+                return jsonify(payload), 200, {"Cache-Control": cache_control, "X-Cache": "HIT"}
+
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            _cache_put(_read_cache, key, response.get_json())
+            response.headers["Cache-Control"] = cache_control
+        return response
+
+    return wrapper
+
+
+# Reads in flight, keyed by (kind, customer_id). The TTL caches absorb
+# repeat polls; this covers the cold burst before the first result lands.
+_inflight_lock = threading.Lock()
+_inflight = {}
+
+
+def _singleflight(key, fn, *args):
+    """Run fn(*args) once for all concurrent callers with the same key; they share its result."""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        result = fn(*args)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+idempotency_log = _tagged_logger("IDEMPOTENCY")
+# Seconds an idempotency-record read or write may spend on Mongo.
+IDEMPOTENCY_DB_TIMEOUT = 2.0
+
+
+def _stored_response(fingerprint, response):
+    return (fingerprint, response.get_data(), response.status_code, response.mimetype)
+
+
+def _run_idempotent(key, fingerprint, view, args, kwargs):
+    """
+    Claim `key` in Mongo, run the view and record its response there.
+
+    Returns (stored, replayed). The record is shared by all worker
+    processes: a key another worker has answered is replayed from it, and
+    one still running there is a 409 instead of a second write.
+    """
+    record_key = orjson.dumps(list(key)).decode()
+    try:
+        with pymongo.timeout(IDEMPOTENCY_DB_TIMEOUT):
+            collection = get_idempotency_collection(IDEMPOTENCY_TTL)
+            try:
+                collection.insert_one({
+                    "key": record_key,
+                    "fingerprint": fingerprint,
+                    "done": False,
+                    "created_at": datetime.now(timezone.utc),
+                })
+            except pymongo.errors.DuplicateKeyError:
+                record = collection.find_one({"key": record_key})
+            else:
+                record = None
+    except pymongo.errors.PyMongoError as e:
+        # Without the record nothing stops another worker from sending the
+        # same write, so it is not sent at all.
+        idempotency_log.error("Failed to claim idempotency key %s: %s", record_key, e)
+        response = app.make_response((jsonify({
+            "success": False,
+            "errors": ["Idempotency store unavailable. Please retry with the same key."],
+        }), 503))
+        return _stored_response(fingerprint, response), False
+
+    if record is not None:
+        if record["done"]:
+            stored = (record["fingerprint"], record["body"], record["status"], record["mimetype"])
+            _cache_put(_idempotent_responses, key, stored)
+            return stored, True
+        response = app.make_response((jsonify({
+            "success": False,
+            "errors": ["A request with this idempotency key is still in progress. Retry later with the same key."],
+        }), 409))
+        return _stored_response(record["fingerprint"], response), False
+
+    response = app.make_response(view(*args, **kwargs))
+    stored = _stored_response(fingerprint, response)
+    # A 502 outcome_unknown is kept too: the mutate may have gone through,
+    # so running it again under the same key could apply it twice.
+    outcome_unknown = response.status_code == 502 and (response.get_json(silent=True) or {}).get("outcome_unknown")
+    try:
+        with pymongo.timeout(IDEMPOTENCY_DB_TIMEOUT):
+            if 200 <= response.status_code < 300 or outcome_unknown:
+                get_idempotency_collection(IDEMPOTENCY_TTL).update_one({"key": record_key}, {"$set": {
+                    "done": True,
+                    "body": stored[1],
+                    "status": stored[2],
+                    "mimetype": stored[3],
+                }})
+            else:
+                get_idempotency_collection(IDEMPOTENCY_TTL).delete_one({"key": record_key})
+    except pymongo.errors.PyMongoError as e:
+        # The claim stays: the key answers 409 until it expires, never a second write.
+        idempotency_log.error("Failed to record the response for idempotency key %s: %s", record_key, e)
+    if 200 <= response.status_code < 300 or outcome_unknown:
+        _cache_put(_idempotent_responses, key, stored)
+    return stored, False
+
+
+def _body_fingerprint(data):
+    """Digest of the JSON body without its idempotency_key, independent of key order and spacing."""
+    body = {k: v for k, v in data.items() if k != "idempotency_key"}
+    return hashlib.sha256(orjson.dumps(body, option=orjson.OPT_SORT_KEYS)).digest()
+
+
+def idempotent(view):
+    """
+    Replay a write endpoint's response for a repeated idempotency key.
+
+    The key comes from the Idempotency-Key header or the body's
+    "idempotency_key" and is scoped by (path with query string, customer_id),
+    so e.g. a ?dry_run=1 call never answers for the real one. 2xx responses
+    and 502 outcome_unknown answers are kept in Mongo (for IDEMPOTENCY_TTL
+    seconds), so every worker process sees them; other failures are not,
+    so they can be retried under the same key. A duplicate arriving while
+    the first is still running waits for it in the same process and gets
+    a 409 in another one. Reusing a key with a different body is a 422.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(silent=True, cache=True) or {}
+        idempotency_key = request.headers.get("Idempotency-Key") or data.get("idempotency_key")
+        if not idempotency_key:
+            return view(*args, **kwargs)
+
+        key = (request.full_path, _parse_customer_id(data.get("customer_id")) or "", str(idempotency_key))
+        fingerprint = _body_fingerprint(data)
+        headers = {}
+        stored = _cache_get(_idempotent_responses, key)
+        replayed = stored is not None
+        if not replayed:
+            stored, replayed = _singleflight(("idempotent",) + key, _run_idempotent, key, fingerprint, view, args, kwargs)
+        if replayed:
+            headers["Idempotent-Replayed"] = "true"
+        stored_fingerprint, body, status, mimetype = stored
+        if stored_fingerprint != fingerprint:
+            return jsonify({
+                "success": False,
+                "errors": ["This idempotency key was already used with a different request body."],
+            }), 422
+        return app.response_class(body, status=status, mimetype=mimetype, headers=headers)
+
+    return wrapper
+
 
 @app.route('/', methods=['GET'])
 def index():
@@ -88,19 +776,25 @@ def index():
             ),
             "POST /assign-billing-setup": (
                 "Assign the MCC or child payments account as billing for an existing client account "
-                "using Google Ads BillingSetupService. Body: {customer_id}"
+                "using Google Ads BillingSetupService. Body: {customer_id, [idempotency_key]}"
             ),
             "POST /update-email": (
                 "Update the dashboard/notification email stored for a given client account. "
-                "Body: {customer_id, email}"
+                "Body: {customer_id, email, [async]}"
             ),
             "POST /approve-topup": (
                 "Approve a topup and create or update an invoiced account budget (hard cap) for the client "
-                "using AccountBudgetProposalService. Body: {customer_id, topup_amount}"
+                "using AccountBudgetProposalService. Body: {customer_id, topup_amount (or integer topup_amount_micros), "
+                "[async], [idempotency_key]}. "
+                "Add ?dry_run=1 to only validate the proposal."
             ),
             "POST /check-and-pause-campaigns": (
                 "Check current spend against the configured soft cap and pause all active campaigns "
-                "for the client if the soft cap is reached/exceeded. Body: {customer_id}"
+                "for the client if the soft cap is reached/exceeded. Body: {customer_id, [async]}"
+            ),
+            "GET /job-status": (
+                "Poll a job queued by a POST endpoint called with \"async\": true (answered 202 with a job_id). "
+                "Query: ?id=JOB_ID"
             ),
             "GET /client-spend-status": (
                 "Get spend and balance status for a client account (based on Google Ads reporting "
@@ -150,9 +844,8 @@ def debug_mcc_billing_setups():
     accounts exist at manager level.
     """
     try:
-        client, mcc_id = load_google_ads_client()  # login_customer_id should be 1331285009
+        client, mcc_id = get_ads_client()  # login_customer_id should be 1331285009
 
-        ga_service = client.get_service("GoogleAdsService")
         query = """
             SELECT
               billing_setup.payments_account,
@@ -164,7 +857,7 @@ def debug_mcc_billing_setups():
             FROM billing_setup
         """
 
-        rows = ga_service.search(customer_id=str(mcc_id), query=query)
+        rows = _search_all(str(mcc_id), query)
 
         results = []
         for row in rows:
@@ -191,21 +884,20 @@ def debug_mcc_billing_setups():
         errs = []
         for err in e.failure.errors:
             errs.append({"code": str(err.error_code), "message": err.message})
-        return jsonify({"success": False, "errors": errs}), 400
+        return error_response(e, {"success": False, "errors": errs}, 400)
 
     except Exception as e:
-        return jsonify({"success": False, "errors": [str(e)]}), 500
+        return error_response(e, {"success": False, "errors": [str(e)]}, 500)
 
 @app.route('/debug-billing-status', methods=['GET'])
 def debug_billing_status():
     """GET /debug-billing-status?customer_id=XXXX"""
-    customer_id = request.args.get('customer_id', '').strip()
-    if not customer_id or not customer_id.isdigit():
+    customer_id = _parse_customer_id(request.args.get('customer_id'))
+    if customer_id is None:
         return jsonify({"success": False, "errors": ["Valid numeric customer_id required."]}), 400
 
     try:
-        client, _ = load_google_ads_client()
-        ga_service = client.get_service("GoogleAdsService")
+        client, _ = get_ads_client()
 
         query = """
             SELECT
@@ -216,7 +908,7 @@ def debug_billing_status():
             ORDER BY billing_setup.id
         """
 
-        rows = ga_service.search(customer_id=customer_id, query=query)
+        rows = _search_all(customer_id, query)
         setups = []
         for row in rows:
             setups.append({
@@ -233,47 +925,35 @@ def debug_billing_status():
 
     except GoogleAdsException as e:
         errs = [{"code": str(err.error_code), "message": err.message} for err in e.failure.errors]
-        return jsonify({"success": False, "errors": errs}), 400
+        return error_response(e, {"success": False, "errors": errs}, 400)
     except Exception as e:
-        return jsonify({"success": False, "errors": [str(e)]}), 500
+        return error_response(e, {"success": False, "errors": [str(e)]}, 500)
 
 from google.ads.googleads.errors import GoogleAdsException
 
-def ensure_customer_active(client, customer_id: str):
-    ga_service = client.get_service("GoogleAdsService")
-    query = """
-        SELECT
-          customer.id,
-          customer.descriptive_name,
-          customer.status
-        FROM customer
-        LIMIT 1
-    """
-    rows = ga_service.search(customer_id=customer_id, query=query)
-    for row in rows:
-        status = row.customer.status.name
-        name = row.customer.descriptive_name
-        if status != "ENABLED":
-            return False, status, name
-        return True, status, name
-    return False, None, None
+_CUSTOMER_STATUS_QUERY = """
+    SELECT
+      customer.id,
+      customer.descriptive_name,
+      customer.status
+    FROM customer
+    LIMIT 1
+"""
 
 
+def ensure_customer_active(client, customer_id: str):
+    status, name = _get_customer_status(client, customer_id)
+    return status == "ENABLED", status, name
+
 
 def _get_customer_status(client, customer_id: str):
-    ga_service = client.get_service("GoogleAdsService")
-    query = """
-        SELECT
-          customer.id,
-          customer.descriptive_name,
-          customer.status
-        FROM customer
-        LIMIT 1
-    """
-    rows = ga_service.search(customer_id=customer_id, query=query)
-    for row in rows:
-        return row.customer.status.name, row.customer.descriptive_name
-    return None, None
+    row = _first_row(customer_id, _CUSTOMER_STATUS_QUERY)
+    if row is None:
+        return None, None
+    return row.customer.status.name, row.customer.descriptive_name
+
+
+end_budgets_log = _tagged_logger("END_BUDGETS")
 
 
 @app.route('/end-all-budgets', methods=['POST'])
@@ -291,20 +971,38 @@ def end_all_budgets():
     - Submit END proposals for each, regardless of suspension status.
     - Note: do NOT include proposed_notes for END proposal type (immutable field error).
     """
-    data = request.json or {}
-    customer_id = str(data.get('customer_id', '')).strip()
+    data = request.get_json(silent=True, cache=True) or {}
+    customer_id = _parse_customer_id(data.get('customer_id'))
 
-    if not customer_id or not customer_id.isdigit():
+    if customer_id is None:
         return jsonify({"success": False, "errors": ["Valid numeric customer_id is required."]}), 400
 
     try:
-        client, _ = load_google_ads_client()
-        ga_service = client.get_service("GoogleAdsService")
-        proposal_service = client.get_service("AccountBudgetProposalService")
+        client, _ = get_ads_client()
+        proposal_service = get_ads_service("AccountBudgetProposalService")
+
+        # The budget list is read on the pool while the customer status is
+        # checked here; it is consumed in step 2.
+        budget_query = """
+            SELECT
+              account_budget.id,
+              account_budget.resource_name,
+              account_budget.status,
+              account_budget.billing_setup,
+              account_budget.approved_spending_limit_micros,
+              account_budget.approved_start_date_time,
+              account_budget.approved_end_date_time
+            FROM account_budget
+            ORDER BY account_budget.id
+        """
+        budgets_future = _submit(_search_all, customer_id, budget_query)
 
         # 1) Block suspended / canceled / closed customers
         ok, status, name = ensure_customer_active(client, customer_id)
         if not ok:
+            # Drop the budget read if it has not started; a running one
+            # finishes within its deadline.
+            budgets_future.cancel()
             return jsonify({
                 "success": False,
                 "errors": [
@@ -314,28 +1012,16 @@ def end_all_budgets():
                 "customer_status": status,
             }), 400
 
-        print("\n[END_BUDGETS] Starting...")
-        print(f"[END_BUDGETS] Customer ID: {customer_id}")
-        print(f"[END_BUDGETS] Customer Name: {name}")
-        print(f"[END_BUDGETS] Customer Status: {status}")
+        end_budgets_log.debug("Starting...")
+        end_budgets_log.debug("Customer ID: %s", customer_id)
+        end_budgets_log.debug("Customer Name: %s", name)
+        end_budgets_log.debug("Customer Status: %s", status)
 
-        # 2) Query all account budgets
-        budget_query = """
-            SELECT
-              account_budget.id,
-              account_budget.resource_name,
-              account_budget.status,
-              account_budget.billing_setup,
-              account_budget.approved_spending_limit_micros,
-              account_budget.approved_start_date_time,
-              account_budget.approved_end_date_time
-            FROM account_budget
-            ORDER BY account_budget.id
-        """
+        # 2) All account budgets
         budgets = []
         all_budgets_found = []
 
-        for row in ga_service.search(customer_id=customer_id, query=budget_query):
+        for row in budgets_future.result():
             b = row.account_budget
             all_budgets_found.append({
                 "id": b.id,
@@ -344,9 +1030,9 @@ def end_all_budgets():
                 "billing_setup": b.billing_setup,
                 "approved_spending_limit_micros": b.approved_spending_limit_micros,
             })
-            print(
-                f"[END_BUDGETS] Found budget: id={b.id}, status={b.status.name}, "
-                f"billing_setup={b.billing_setup}"
+            end_budgets_log.debug(
+                "Found budget: id=%s, status=%s, billing_setup=%s",
+                b.id, b.status.name, b.billing_setup,
             )
 
             # Consider everything except ENDED / CANCELLED as eligible to END
@@ -369,9 +1055,9 @@ def end_all_budgets():
         failed = []
 
         for b in budgets:
-            op = client.get_type("AccountBudgetProposalOperation")
+            op = _get_type(client, "AccountBudgetProposalOperation")
             proposal = op.create
-            proposal_type_enum = client.enums.AccountBudgetProposalTypeEnum
+            proposal_type_enum = _get_enum(client, "AccountBudgetProposalTypeEnum")
 
             proposal.proposal_type = proposal_type_enum.END
             proposal.account_budget = b.resource_name
@@ -381,7 +1067,8 @@ def end_all_budgets():
             try:
                 resp = proposal_service.mutate_account_budget_proposal(
                     customer_id=customer_id,
-                    operation=op
+                    operation=op,
+                    timeout=mutate_timeout(),
                 )
                 proposal_resource = resp.result.resource_name
                 proposal_id = proposal_resource.split("/")[-1]
@@ -393,7 +1080,7 @@ def end_all_budgets():
                     "end_proposal_resource": proposal_resource,
                     "end_proposal_id": proposal_id,
                 })
-                print(f"[END_BUDGETS] SUCCESS: Budget {b.id} ended. Proposal: {proposal_resource}")
+                end_budgets_log.info("SUCCESS: Budget %s ended. Proposal: %s", b.id, proposal_resource)
 
             except GoogleAdsException as e:
                 error_list = []
@@ -402,13 +1089,16 @@ def end_all_budgets():
                         "error_code": str(err.error_code),
                         "message": err.message
                     })
-                    print(f"[END_BUDGETS] Error on budget {b.id}: {err.message}")
+                    end_budgets_log.error("Error on budget %s: %s", b.id, err.message)
                 failed.append({
                     "account_budget_id": b.id,
                     "account_budget": b.resource_name,
                     "errors": error_list
                 })
 
+        if ended:
+            invalidate_customer_caches(customer_id)
+
         return jsonify({
             "success": True,
             "customer_id": customer_id,
@@ -421,7 +1111,7 @@ def end_all_budgets():
                 f"END proposals submitted for {len(ended)} active budgets. "
                 f"{len(failed)} failed."
             ),
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _now_iso()
         }), 200
 
     except GoogleAdsException as e:
@@ -431,17 +1121,16 @@ def end_all_budgets():
                 "error_code": str(err.error_code),
                 "message": err.message
             })
-        print(f"[END_BUDGETS] GoogleAdsException: {error_details}")
-        return jsonify({"success": False, "errors": error_details}), 400
+        end_budgets_log.error("GoogleAdsException: %s", error_details)
+        return error_response(e, {"success": False, "errors": error_details}, 400)
 
     except Exception as e:
-        print(f"[END_BUDGETS] Exception: {str(e)}")
-        return jsonify({"success": False, "errors": [str(e)]}), 500
-
-
+        end_budgets_log.error("Exception: %s", e)
+        return error_response(e, {"success": False, "errors": [str(e)]}, 500)
 
 
 @app.route('/list-payments-accounts', methods=['GET'])
+@cached_read
 def list_payments_accounts():
     """
     GET /list-payments-accounts?customer_id=XXXX
@@ -453,22 +1142,22 @@ def list_payments_accounts():
     The payments account's paying_manager_customer field tells you
     if the account is under your manager hierarchy.
     """
-    serving_cid = request.args.get('customer_id', '').strip()
+    serving_cid = _parse_customer_id(request.args.get('customer_id'))
 
-    if not serving_cid or not serving_cid.isdigit():
+    if serving_cid is None:
         return jsonify({
             "success": False,
             "errors": ["Valid numeric customer_id (serving account) is required."],
         }), 400
 
     try:
-        client, mcc_id = load_google_ads_client()
+        client, mcc_id = get_ads_client()
 
-        service = client.get_service("PaymentsAccountService")
-        request_proto = client.get_type("ListPaymentsAccountsRequest")
+        service = get_ads_service("PaymentsAccountService")
+        request_proto = _get_type(client, "ListPaymentsAccountsRequest")
         request_proto.customer_id = serving_cid  # must be serving account, not manager
 
-        response = service.list_payments_accounts(request=request_proto)
+        response = service.list_payments_accounts(request=request_proto, timeout=rpc_timeout(GAQL_TIMEOUT))
 
         results = []
         for pa in response.payments_accounts:
@@ -485,7 +1174,7 @@ def list_payments_accounts():
             "serving_customer_id": serving_cid,
             "count": len(results),
             "payments_accounts": results,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _now_iso()
         }), 200
 
     except GoogleAdsException as e:
@@ -495,10 +1184,10 @@ def list_payments_accounts():
                 "error_code": str(err.error_code),
                 "message": err.message
             })
-        return jsonify({"success": False, "errors": error_details}), 400
+        return error_response(e, {"success": False, "errors": error_details}, 400)
 
     except Exception as e:
-        return jsonify({"success": False, "errors": [str(e)]}), 500
+        return error_response(e, {"success": False, "errors": [str(e)]}, 500)
 
 
 from google.ads.googleads.errors import GoogleAdsException
@@ -512,11 +1201,11 @@ def check_user_invite_status():
       - invitation_status: PENDING / NOT_FOUND
       - If NOT_FOUND, also tells you whether the user is already active on the account.
     """
-    customer_id = (request.args.get('customer_id') or '').strip()
+    customer_id = _parse_customer_id(request.args.get('customer_id'))
     email = (request.args.get('email') or '').strip()
 
     errors = []
-    if not customer_id or not customer_id.isdigit():
+    if customer_id is None:
         errors.append("Valid numeric customer_id required.")
     if not email:
         errors.append("email query parameter is required.")
@@ -525,8 +1214,7 @@ def check_user_invite_status():
         return jsonify({"success": False, "errors": errors}), 400
 
     try:
-        client, _ = load_google_ads_client()
-        ga_service = client.get_service("GoogleAdsService")
+        client, _ = get_ads_client()
 
         # 1) Check pending invitations for this email
         invite_query = f"""
@@ -540,30 +1228,28 @@ def check_user_invite_status():
               customer_user_access_invitation
             WHERE
               customer_user_access_invitation.email_address = '{email}'
+              AND customer_user_access_invitation.invitation_status = 'PENDING'
+            LIMIT 1
         """
 
-        pending_invites = []
-        for row in ga_service.search(customer_id=customer_id, query=invite_query):
+        # 2) If an invitation is still PENDING, report that
+        row = _first_row(customer_id, invite_query)
+        if row is not None:
             inv = row.customer_user_access_invitation
-            pending_invites.append({
-                "invitation_id": inv.invitation_id,
-                "email": inv.email_address,
-                "access_role": inv.access_role.name,
-                "invitation_status": inv.invitation_status.name,
-                "creation_date_time": inv.creation_date_time,
-            })
-
-        # 2) If at least one invitation is still PENDING, report that
-        for inv in pending_invites:
-            if inv["invitation_status"] == "PENDING":
-                return jsonify({
-                    "success": True,
-                    "customer_id": customer_id,
-                    "email": email,
-                    "invitation_status": "PENDING",
-                    "details": inv,
-                    "message": "User invitation is still PENDING for this email."
-                }), 200
+            return jsonify({
+                "success": True,
+                "customer_id": customer_id,
+                "email": email,
+                "invitation_status": "PENDING",
+                "details": {
+                    "invitation_id": inv.invitation_id,
+                    "email": inv.email_address,
+                    "access_role": inv.access_role.name,
+                    "invitation_status": inv.invitation_status.name,
+                    "creation_date_time": inv.creation_date_time,
+                },
+                "message": "User invitation is still PENDING for this email."
+            }), 200
 
         # 3) No pending invite; check if user is already active on the account
         access_query = f"""
@@ -577,10 +1263,12 @@ def check_user_invite_status():
               customer_user_access
             WHERE
               customer_user_access.email_address = '{email}'
+            LIMIT 1
         """
 
         active_user = None
-        for row in ga_service.search(customer_id=customer_id, query=access_query):
+        row = _first_row(customer_id, access_query)
+        if row is not None:
             ua = row.customer_user_access
             active_user = {
                 "user_id": ua.user_id,
@@ -589,7 +1277,6 @@ def check_user_invite_status():
                 "access_creation_date_time": ua.access_creation_date_time,
                 "inviter_email": ua.inviter_user_email_address,
             }
-            break
 
         if active_user:
             return jsonify({
@@ -614,9 +1301,12 @@ def check_user_invite_status():
 
     except GoogleAdsException as e:
         errs = [{"code": str(err.error_code), "message": err.message} for err in e.failure.errors]
-        return jsonify({"success": False, "errors": errs}), 400
+        return error_response(e, {"success": False, "errors": errs}, 400)
     except Exception as e:
-        return jsonify({"success": False, "errors": [str(e)]}), 500
+        return error_response(e, {"success": False, "errors": [str(e)]}, 500)
+
+
+manager_billing_log = _tagged_logger("CHECK-MANAGER-BILLING")
 
 
 @app.route('/check-manager-billing-accounts', methods=['GET'])
@@ -630,9 +1320,9 @@ def check_manager_billing_accounts():
     A payments account is "usable" if its paying_manager_customer 
     matches the MCC's customer ID.
     """
-    serving_cid = request.args.get('serving_customer_id', '').strip()
+    serving_cid = _parse_customer_id(request.args.get('serving_customer_id'))
 
-    if not serving_cid or not serving_cid.isdigit():
+    if serving_cid is None:
         return jsonify({
             "success": False,
             "can_do_programmatic_billing": False,
@@ -641,19 +1331,21 @@ def check_manager_billing_accounts():
         }), 400
 
     try:
-        client, mcc_id = load_google_ads_client()
+        client, mcc_id = get_ads_client()
 
-        print(f"\n[CHECK-MANAGER-BILLING] Starting...")
-        print(f"[CHECK-MANAGER-BILLING] MCC ID: {mcc_id}")
-        print(f"[CHECK-MANAGER-BILLING] Serving Customer ID: {serving_cid}")
+        manager_billing_log.debug("Starting...")
+        manager_billing_log.debug("MCC ID: %s", mcc_id)
+        manager_billing_log.debug("Serving Customer ID: %s", serving_cid)
 
         # 1) List payments accounts visible to this serving customer
-        service = client.get_service("PaymentsAccountService")
-        request_proto = client.get_type("ListPaymentsAccountsRequest")
+        service = get_ads_service("PaymentsAccountService")
+        request_proto = _get_type(client, "ListPaymentsAccountsRequest")
         request_proto.customer_id = serving_cid
 
-        response = service.list_payments_accounts(request=request_proto)
+        response = service.list_payments_accounts(request=request_proto, timeout=rpc_timeout(GAQL_TIMEOUT))
 
+        # Compare whole resource names; ListPaymentsAccounts has no server-side filter.
+        mcc_resource = f"customers/{mcc_id}"
         all_payments_accounts = []
         manager_payments_accounts = []
 
@@ -666,25 +1358,20 @@ def check_manager_billing_accounts():
             }
             all_payments_accounts.append(account)
 
-            # Extract numeric customer ID from resource name
             # paying_manager_customer format: "customers/1331285009"
-            if pa.paying_manager_customer:
-                manager_cid = pa.paying_manager_customer.split('/')[-1]
-                print(f"[CHECK-MANAGER-BILLING] Checking payment account {pa.payments_account_id}:")
-                print(f"  paying_manager_customer: {pa.paying_manager_customer}")
-                print(f"  extracted manager_cid: {manager_cid}")
-                print(f"  mcc_id: {mcc_id}")
-                print(f"  match: {manager_cid == mcc_id}")
-                
-                if manager_cid == mcc_id:
-                    manager_payments_accounts.append(account)
-                    print(f"  ✓ ADDED to manager_payments_accounts")
+            is_manager_owned = pa.paying_manager_customer == mcc_resource
+            manager_billing_log.debug(
+                "Checking payment account %s: paying_manager_customer=%s match=%s",
+                pa.payments_account_id, pa.paying_manager_customer, is_manager_owned,
+            )
+            if is_manager_owned:
+                manager_payments_accounts.append(account)
 
         can_do_billing = len(manager_payments_accounts) > 0
 
-        print(f"[CHECK-MANAGER-BILLING] Total payments accounts: {len(all_payments_accounts)}")
-        print(f"[CHECK-MANAGER-BILLING] Manager-owned accounts: {len(manager_payments_accounts)}")
-        print(f"[CHECK-MANAGER-BILLING] Can do programmatic billing: {can_do_billing}\n")
+        manager_billing_log.debug("Total payments accounts: %d", len(all_payments_accounts))
+        manager_billing_log.debug("Manager-owned accounts: %d", len(manager_payments_accounts))
+        manager_billing_log.debug("Can do programmatic billing: %s", can_do_billing)
 
         return jsonify({
             "success": True,
@@ -705,7 +1392,7 @@ def check_manager_billing_accounts():
                 "one of the manager_payments_accounts[].payments_account_id values. "
                 "If false, use manual billing via Google Ads UI + logical soft caps."
             ),
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _now_iso()
         }), 200
 
     except GoogleAdsException as e:
@@ -715,25 +1402,27 @@ def check_manager_billing_accounts():
                 "error_code": str(err.error_code),
                 "message": err.message
             })
-        return jsonify({
+        return error_response(e, {
             "success": False,
             "can_do_programmatic_billing": False,
             "errors": error_details,
-        }), 400
+        }, 400)
 
     except Exception as e:
-        print(f"[CHECK-MANAGER-BILLING] EXCEPTION: {str(e)}")
-        return jsonify({
+        manager_billing_log.error("EXCEPTION: %s", e)
+        return error_response(e, {
             "success": False,
             "can_do_programmatic_billing": False,
             "errors": [str(e)],
-        }), 500
+        }, 500)
 
 
 # ============================================================================
 # DEBUG ENDPOINT: GET PAYMENTS ACCOUNTS
 # ============================================================================
 
+debug_log = _tagged_logger("DEBUG")
+
 @app.route('/debug-get-payments-accounts', methods=['GET'])
 def debug_get_payments_accounts():
     """
@@ -743,16 +1432,15 @@ def debug_get_payments_accounts():
     
     Retrieves all payments accounts linked to a customer (for debugging).
     """
-    customer_id = request.args.get('customer_id', '').strip()
+    customer_id = _parse_customer_id(request.args.get('customer_id'))
     
-    if not customer_id or not customer_id.isdigit():
+    if customer_id is None:
         return jsonify({"success": False, "errors": ["Valid numeric customer_id required."]}), 400
     
     try:
-        client, mcc_id = load_google_ads_client()
-        ga_service = client.get_service("GoogleAdsService")
+        client, mcc_id = get_ads_client()
         
-        print(f"\n[DEBUG] Getting payments accounts for customer: {customer_id}")
+        debug_log.debug("Getting payments accounts for customer: %s", customer_id)
         
         query = """
             SELECT
@@ -764,8 +1452,8 @@ def debug_get_payments_accounts():
             ORDER BY billing_setup.creation_date_time DESC
         """
         
-        print(f"[DEBUG] Query: {query}")
-        response = ga_service.search(customer_id=customer_id, query=query)
+        debug_log.debug("Query: %s", query)
+        response = _search_all(customer_id, query)
         
         results = []
         for row in response:
@@ -777,30 +1465,86 @@ def debug_get_payments_accounts():
                 "end_date": bs.end_date_time
             }
             results.append(result)
-            print(f"[DEBUG] Found: {result}")
+            debug_log.debug("Found: %s", result)
         
-        print(f"[DEBUG] SUCCESS! Found {len(results)} billing setups\n")
+        debug_log.debug("SUCCESS! Found %d billing setups", len(results))
         
         return jsonify({
             "success": True,
             "customer_id": customer_id,
             "billing_setups_count": len(results),
             "billing_setups": results,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _now_iso()
         }), 200
     
     except GoogleAdsException as e:
         error_details = [f"{err.error_code.name}: {err.message}" for err in e.failure.errors]
-        print(f"[DEBUG] ERROR: {error_details}")
-        return jsonify({"success": False, "errors": error_details}), 400
+        debug_log.error("ERROR: %s", error_details)
+        return error_response(e, {"success": False, "errors": error_details}, 400)
     
     except Exception as e:
-        print(f"[DEBUG] EXCEPTION: {str(e)}")
-        return jsonify({"success": False, "errors": [str(e)]}), 500
+        debug_log.error("EXCEPTION: %s", e)
+        return error_response(e, {"success": False, "errors": [str(e)]}, 500)
 # ============================================================================
 # ENDPOINT: CHECK BILLING ELIGIBILITY (DEBUG)
 # ============================================================================
 
+check_billing_log = _tagged_logger("CHECK-BILLING")
+health_log = _tagged_logger("DEBUG-HEALTH")
+
+# Billing setup listing shared by check-billing-eligibility and debug-account-health.
+_BILLING_SETUPS_QUERY = """
+    SELECT
+      billing_setup.resource_name,
+      billing_setup.payments_account,
+      billing_setup.status,
+      billing_setup.start_date_time,
+      billing_setup.end_date_time
+    FROM billing_setup
+"""
+
+# Row -> dict field maps shared by the billing_setup / account_budget listings.
+# attrgetter fetches every field of a row in a single C call.
+_BILLING_SETUP_KEYS = ("resource_name", "payments_account", "status", "start_date", "end_date")
+_BILLING_SETUP_FIELDS = attrgetter(
+    "resource_name", "payments_account", "status", "start_date_time", "end_date_time"
+)
+
+_ACCOUNT_BUDGET_KEYS = (
+    "id",
+    "resource_name",
+    "status",
+    "approved_spending_limit_micros",
+    "proposed_spending_limit_micros",
+    "approved_start_date_time",
+    "approved_end_date_time",
+)
+_ACCOUNT_BUDGET_FIELDS = attrgetter(
+    "id",
+    "resource_name",
+    "status",
+    "approved_spending_limit_micros",
+    "proposed_spending_limit_micros",
+    "approved_start_date_time",
+    "approved_end_date_time",
+)
+
+
+def _rows_to_dicts(customer_id, query, resource, keys, fields, status_names):
+    """
+    Run `query` through _search_all and flatten its rows into dicts, resolving "status" via status_names.
+
+    Fields are read from the raw protobuf (row._pb) rather than through the
+    proto-plus wrappers, which marshal every attribute access; enums come
+    back as plain ints, hence the status_names lookup.
+    """
+    rows = []
+    for row in _search_all(customer_id, query):
+        record = dict(zip(keys, fields(getattr(row._pb, resource))))
+        record["status"] = status_names[int(record["status"])]
+        rows.append(record)
+    return rows
+
 
 @app.route('/check-billing-eligibility', methods=['POST'])
 def check_billing_eligibility():
@@ -815,18 +1559,33 @@ def check_billing_eligibility():
         "customer_id": "1234567890"
     }
     """
-    data = request.json or {}
-    customer_id = str(data.get('customer_id', '')).strip()
+    data = request.get_json(silent=True, cache=True) or {}
+    customer_id = _parse_customer_id(data.get('customer_id'))
 
-    if not customer_id or not customer_id.isdigit():
+    # customer_id is templated into GAQL below; _parse_customer_id admits
+    # ASCII digits only.
+    if customer_id is None:
         return jsonify({"success": False, "errors": ["Valid numeric customer_id required."]}), 400
 
     try:
-        client, mcc_id = load_google_ads_client()
-        ga_service = client.get_service("GoogleAdsService")
-
-        print(f"\n[CHECK-BILLING] Starting...")
-        print(f"[CHECK-BILLING] Customer ID: {customer_id}")
+        client, mcc_id = get_ads_client()
+
+        check_billing_log.debug("Starting...")
+        check_billing_log.debug("Customer ID: %s", customer_id)
+
+        # Query 2 (billing setups) does not depend on query 1, so it is
+        # started on the pool first and collected after the manager check.
+
+        check_billing_log.debug("Query 2: Getting billing setups...")
+        billing_future = _submit(
+            _rows_to_dicts,
+            customer_id,
+            _BILLING_SETUPS_QUERY,
+            "billing_setup",
+            _BILLING_SETUP_KEYS,
+            _BILLING_SETUP_FIELDS,
+            _enum_names(client, "BillingSetupStatusEnum"),
+        )
 
         # Query 1: basic customer info (is_manager flag)
         query_manager = f"""
@@ -835,51 +1594,32 @@ def check_billing_eligibility():
               customer.manager,
               customer.test_account
             FROM customer
-            WHERE customer.id = '{customer_id}'
-        """
-
-        print("[CHECK-BILLING] Query 1: Checking if customer is manager...")
-        response_manager = ga_service.search(customer_id=customer_id, query=query_manager)
-
-        is_manager = False
-        for row in response_manager:
-            is_manager = row.customer.manager
-            print(f"[CHECK-BILLING] is_manager: {is_manager}")
-
-        # Query 2: list billing setups and their payments_account
-        query_billing = """
-            SELECT
-              billing_setup.resource_name,
-              billing_setup.payments_account,
-              billing_setup.status,
-              billing_setup.start_date_time,
-              billing_setup.end_date_time
-            FROM billing_setup
+            WHERE customer.id = {customer_id}
         """
 
-        print("[CHECK-BILLING] Query 2: Getting billing setups...")
-        response_billing = ga_service.search(customer_id=customer_id, query=query_billing)
-
-        billing_setups = []
-        payments_accounts = set()
+        check_billing_log.debug("Query 1: Checking if customer is manager...")
+        row = _first_row(customer_id, query_manager)
+        if row is None:
+            billing_future.cancel()
+            return jsonify({
+                "success": False,
+                "errors": [f"customer_id {customer_id} not accessible"]
+            }), 404
 
-        for row in response_billing:
-            bs = row.billing_setup
-            setup = {
-                "resource_name": bs.resource_name,
-                "payments_account": bs.payments_account,
-                "status": bs.status.name,
-                "start_date": bs.start_date_time,
-                "end_date": bs.end_date_time,
-            }
-            billing_setups.append(setup)
-            if bs.payments_account:
-                payments_accounts.add(bs.payments_account)
-            print(f"[CHECK-BILLING] Billing Setup: {setup}")
+        is_manager = row.customer.manager
+        check_billing_log.debug("is_manager: %s", is_manager)
 
-        payments_accounts_list = list(payments_accounts)
+        # Query 2: billing setups and their payments_account
+        billing_setups = billing_future.result()
+        # dict.fromkeys dedupes in one pass and keeps the billing_setup order.
+        payments_accounts_list = list(dict.fromkeys(
+            setup["payments_account"] for setup in billing_setups if setup["payments_account"]
+        ))
+        if check_billing_log.isEnabledFor(logging.DEBUG):
+            for setup in billing_setups:
+                check_billing_log.debug("Billing Setup: %s", setup)
 
-        print("[CHECK-BILLING] SUCCESS!\n")
+        check_billing_log.debug("SUCCESS!")
 
         return jsonify({
             "success": True,
@@ -890,7 +1630,7 @@ def check_billing_eligibility():
             "payments_accounts": payments_accounts_list,
             "payments_accounts_count": len(payments_accounts_list),
             "message": f"Found {len(billing_setups)} billing setups and {len(payments_accounts_list)} distinct payments_account resource names.",
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _now_iso()
         }), 200
 
     except GoogleAdsException as e:
@@ -900,12 +1640,67 @@ def check_billing_eligibility():
                 "error_code": str(err.error_code),
                 "message": err.message
             })
-        print(f"[CHECK-BILLING] ERROR: {error_details}")
-        return jsonify({"success": False, "errors": error_details}), 400
+        check_billing_log.error("ERROR: %s", error_details)
+        return error_response(e, {"success": False, "errors": error_details}, 400)
 
     except Exception as e:
-        print(f"[CHECK-BILLING] EXCEPTION: {str(e)}")
-        return jsonify({"success": False, "errors": [str(e)]}), 500
+        check_billing_log.error("EXCEPTION: %s", e)
+        return error_response(e, {"success": False, "errors": [str(e)]}, 500)
+
+
+# Input formats, compiled once at import.
+# \Z rather than $, which would also accept a trailing newline.
+_EMAIL_RE = re.compile(r"^[^@]+@[^@]+\.[^@]+\Z")
+_CURRENCY_RE = re.compile(r"^[A-Z]{3}\Z")
+_PAYACCT_RE = re.compile(r"^\d{4}-\d{4}-\d{4}-\d{4}\Z")
+_NAME_RE = re.compile(r"^[^<>/]{1,100}\Z")
+
+# Payments account used by /assign-billing-setup. It is fixed for the life
+# of the process, so it is read and validated once here; a malformed value
+# stops the app at boot instead of failing every request.
+MCC_PAYMENTS_ACCOUNT_RESOURCE = os.getenv("MCC_PAYMENTS_ACCOUNT_RESOURCE", "").strip()
+CHILD_PAYMENTS_ACCOUNT_ID = os.getenv("CHILD_PAYMENTS_ACCOUNT_ID", "").strip()
+if CHILD_PAYMENTS_ACCOUNT_ID and not _PAYACCT_RE.match(CHILD_PAYMENTS_ACCOUNT_ID):
+    raise ValueError("CHILD_PAYMENTS_ACCOUNT_ID must look like 1234-5678-9012-3456")
+
+
+@dataclass
+class CreateAccountInput:
+    """Validated body of POST /create-account."""
+    name: str
+    currency: str
+    timezone: str
+    email: str
+    tracking_url: Optional[str] = None
+    final_url_suffix: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, data) -> Tuple["CreateAccountInput", List[str]]:
+        """Parse and validate in one pass; returns (input, errors)."""
+        payload = cls(
+            name=str(data.get('name') or '').strip(),
+            currency=str(data.get('currency') or '').strip().upper(),
+            timezone=str(data.get('timezone') or '').strip(),
+            email=str(data.get('email') or '').strip(),
+            tracking_url=data.get('tracking_url'),
+            final_url_suffix=data.get('final_url_suffix'),
+        )
+
+        errors = []
+        name = payload.name
+        if not (_NAME_RE.match(name) and name.isprintable()):
+            errors.append("Account name must be 1–100 characters, cannot include <, >, or /.")
+        if not _CURRENCY_RE.match(payload.currency):
+            errors.append("Currency must be a 3-letter currency code, e.g. USD, PKR.")
+        timezone = payload.timezone
+        if not (timezone and all(x != '' for x in timezone.split('/')) and 3 <= len(timezone) <= 50):
+            errors.append("Time zone must be a valid string, e.g. Asia/Karachi.")
+        if not _EMAIL_RE.match(payload.email):
+            errors.append("Valid access email is required.")
+        return payload, errors
+
+
+create_account_log = _tagged_logger("CREATE-ACCOUNT")
 
 
 @app.route('/create-account', methods=['POST'])
@@ -914,6 +1709,10 @@ def create_account():
     POST /create-account
     
     Creates new client account under MCC. NO auto-billing assignment.
+
+    The dashboard invitation (STANDARD role) rides on the same
+    CreateCustomerClient call, so the account and the invite succeed or
+    fail together.
     
     Expected JSON:
     {
@@ -925,97 +1724,79 @@ def create_account():
         "final_url_suffix": "optional"
     }
     """
-    data = request.json or {}
-    name = data.get('name', '').strip()
-    currency = data.get('currency', '').strip().upper()
-    timezone = data.get('timezone', '').strip()
-    tracking_url = data.get('tracking_url')
-    final_url_suffix = data.get('final_url_suffix')
-    email = data.get('email', '').strip()
-
-    errors = []
-    if not (1 <= len(name) <= 100 and all(c.isprintable() and c not in "<>/" for c in name)):
-        errors.append("Account name must be 1–100 characters, cannot include <, >, or /.")
-    if not re.match(r"^[A-Z]{3}$", currency):
-        errors.append("Currency must be a 3-letter currency code, e.g. USD, PKR.")
-    if not (timezone and all(x != '' for x in timezone.split('/')) and 3 <= len(timezone) <= 50):
-        errors.append("Time zone must be a valid string, e.g. Asia/Karachi.")
-    if not email or not re.match(r"^[^@]+@[^@]+\.[^@]+$", email):
-        errors.append("Valid access email is required.")
+    data = request.get_json(silent=True, cache=True) or {}
+    payload, errors = CreateAccountInput.from_json(data)
     if errors:
         return jsonify({"success": False, "errors": errors, "accounts": []}), 400
 
-    for attempt in range(3):
-        try:
-            client, mcc_customer_id = load_google_ads_client()
-            customer_service = client.get_service("CustomerService")
-            customer = client.get_type("Customer")
-            customer.descriptive_name = name
-            customer.currency_code = currency
-            customer.time_zone = timezone
-            if tracking_url:
-                customer.tracking_url_template = tracking_url
-            if final_url_suffix:
-                customer.final_url_suffix = final_url_suffix
-
-            response = customer_service.create_customer_client(
-                customer_id=mcc_customer_id,
-                customer_client=customer
-            )
-            customer_id = response.resource_name.split('/')[-1]
-
-            # Invite user to dashboard
-            invitation_service = client.get_service("CustomerUserAccessInvitationService")
-            invitation_operation = client.get_type("CustomerUserAccessInvitationOperation")
-            invitation = invitation_operation.create
-            invitation.email_address = email
-            invitation.access_role = client.enums.AccessRoleEnum.STANDARD
-            invitation_service.mutate_customer_user_access_invitation(
-                customer_id=customer_id,
-                operation=invitation_operation
-            )
+    name = payload.name
+    email = payload.email
+
+    def _call():
+        client, mcc_customer_id = get_ads_client()
+        customer_service = get_ads_service("CustomerService")
+        create_request = _get_type(client, "CreateCustomerClientRequest")
+        create_request.customer_id = mcc_customer_id
+        create_request.email_address = email
+        create_request.access_role = _get_enum(client, "AccessRoleEnum").STANDARD
+        customer = create_request.customer_client
+        customer.descriptive_name = name
+        customer.currency_code = payload.currency
+        customer.time_zone = payload.timezone
+        if payload.tracking_url:
+            customer.tracking_url_template = payload.tracking_url
+        if payload.final_url_suffix:
+            customer.final_url_suffix = payload.final_url_suffix
+
+        response = mutate_once(
+            customer_service.create_customer_client, request=create_request, timeout=mutate_timeout()
+        )
+        customer_id = response.resource_name.split('/')[-1]
+        create_account_log.info("Created customer %s and invited %s", customer_id, email)
+        invalidate_customer_caches(customer_id, mcc_level=True)
 
-            return jsonify({
-                "success": True,
-                "resource_name": response.resource_name,
-                "customer_id": customer_id,
-                "invite_sent": True,
-                "invited_email": email,
-                "role": "STANDARD",
-                "message": f"Account {name} created. Customer ID: {customer_id}. Next: Call /assign-billing-setup",
-                "accounts": []
-            }), 200
+        return jsonify({
+            "success": True,
+            "resource_name": response.resource_name,
+            "customer_id": customer_id,
+            "invite_sent": True,
+            "invitation_link": response.invitation_link,
+            "invited_email": email,
+            "role": "STANDARD",
+            "message": f"Account {name} created. Customer ID: {customer_id}. Next: Call /assign-billing-setup",
+            "accounts": []
+        }), 200
 
-        except Exception as e:
-            if is_network_error(e):
-                if attempt < 2:
-                    time.sleep(5)
-                    continue
-                return jsonify({"success": False, "errors": ["Network error. Please try again.", str(e)], "accounts": []}), 500
-            err_msg = str(e)
-            user_msg = []
-            if "currency_code" in err_msg:
-                user_msg.append("Possible invalid currency code. Valid codes include USD, PKR, EUR, etc.")
-            if "time_zone" in err_msg or "timezone" in err_msg:
-                user_msg.append("Possible invalid time zone.")
-            if "descriptive_name" in err_msg:
-                user_msg.append("Problem with the account name.")
-            if "email" in err_msg:
-                user_msg.append("Problem with the provided email address.")
-            return jsonify({"success": False, "errors": user_msg + [err_msg], "accounts": []}), 400
-    return jsonify({"success": False, "errors": ["Max network retries reached."], "accounts": []}), 500
+    try:
+        return retry_rpc(_call)
+    except Exception as e:
+        if isinstance(e, MutateOutcomeUnknown):
+            return jsonify({"success": False, "outcome_unknown": True, "errors": [str(e)], "accounts": []}), 502
+        if is_network_error(e):
+            return jsonify({"success": False, "errors": ["Network error. Please try again.", str(e)], "accounts": []}), 500
+        err_msg = str(e)
+        user_msg = []
+        if "currency_code" in err_msg:
+            user_msg.append("Possible invalid currency code. Valid codes include USD, PKR, EUR, etc.")
+        if "time_zone" in err_msg or "timezone" in err_msg:
+            user_msg.append("Possible invalid time zone.")
+        if "descriptive_name" in err_msg:
+            user_msg.append("Problem with the account name.")
+        if "email" in err_msg:
+            user_msg.append("Problem with the provided email address.")
+        return error_response(e, {"success": False, "errors": user_msg + [err_msg], "accounts": []}, 400)
 
 
 @app.route('/list-linked-accounts', methods=['GET'])
+@cached_read
 def list_linked_accounts():
     # mcc_id comes from YAML (login_customer_id), not from query anymore
     try:
-        client, mcc_id = load_google_ads_client()
+        client, mcc_id = get_ads_client()
     except Exception as e:
-        return jsonify({"success": False, "errors": [str(e)], "accounts": []}), 500
+        return error_response(e, {"success": False, "errors": [str(e)], "accounts": []}, 500)
 
     try:
-        ga_service = client.get_service("GoogleAdsService")
         query = """
             SELECT
               customer_client.client_customer,
@@ -1024,20 +1805,23 @@ def list_linked_accounts():
             FROM customer_client
             ORDER BY customer_client.descriptive_name
         """
-        response = ga_service.search(customer_id=mcc_id, query=query)
+        response = _search_all(mcc_id, query)
+        status_names = _enum_names(client, "CustomerStatusEnum")
         results = []
         for row in response:
+            cc = row._pb.customer_client
             results.append({
-                "client_id": row.customer_client.client_customer.split('/')[-1],
-                "name": row.customer_client.descriptive_name,
-                "status": row.customer_client.status.name
+                "client_id": cc.client_customer.split('/')[-1],
+                "name": cc.descriptive_name,
+                "status": status_names[cc.status]
             })
         return jsonify({"success": True, "accounts": results, "errors": []}), 200
     except Exception as e:
-        return jsonify({"success": False, "errors": [str(e)], "accounts": []}), 500
+        return error_response(e, {"success": False, "errors": [str(e)], "accounts": []}, 500)
 
 
 @app.route('/debug-account-health', methods=['GET'])
+@cached_read
 def debug_account_health():
     """
     GET /debug-account-health?customer_id=XXXX
@@ -1048,74 +1832,21 @@ def debug_account_health():
     - Account budgets (limits and status)
     - Current total spend (metrics.cost_micros)
     """
-    customer_id = request.args.get('customer_id', '').strip()
+    customer_id = _parse_customer_id(request.args.get('customer_id'))
 
-    if not customer_id or not customer_id.isdigit():
+    # customer_id is templated into GAQL below; _parse_customer_id admits
+    # ASCII digits only.
+    if customer_id is None:
         return jsonify({"success": False, "errors": ["Valid numeric customer_id required."]}), 400
 
     try:
-        client, mcc_id = load_google_ads_client()
-        ga_service = client.get_service("GoogleAdsService")
-
-        print(f"\n[DEBUG-HEALTH] Starting for customer: {customer_id}")
-        print(f"[DEBUG-HEALTH] MCC: {mcc_id}")
-
-        # 1) Customer info
-        customer_info = {}
-        query_customer = f"""
-            SELECT
-              customer.id,
-              customer.descriptive_name,
-              customer.currency_code,
-              customer.time_zone,
-              customer.manager,
-              customer.test_account
-            FROM customer
-            WHERE customer.id = '{customer_id}'
-        """
-        print("[DEBUG-HEALTH] Query customer info...")
-        resp_customer = ga_service.search(customer_id=customer_id, query=query_customer)
-        for row in resp_customer:
-            c = row.customer
-            customer_info = {
-                "id": c.id,
-                "name": c.descriptive_name,
-                "currency_code": c.currency_code,
-                "time_zone": c.time_zone,
-                "is_manager": c.manager,
-                "is_test_account": c.test_account,
-            }
-            break
+        client, mcc_id = get_ads_client()
 
-        # 2) Billing setups
-        billing_setups = []
-        payments_accounts_set = set()
-        query_billing = """
-            SELECT
-              billing_setup.resource_name,
-              billing_setup.payments_account,
-              billing_setup.status,
-              billing_setup.start_date_time,
-              billing_setup.end_date_time
-            FROM billing_setup
-        """
-        print("[DEBUG-HEALTH] Query billing setups...")
-        resp_billing = ga_service.search(customer_id=customer_id, query=query_billing)
-        for row in resp_billing:
-            bs = row.billing_setup
-            setup = {
-                "resource_name": bs.resource_name,
-                "payments_account": bs.payments_account,
-                "status": bs.status.name,
-                "start_date": bs.start_date_time,
-                "end_date": bs.end_date_time,
-            }
-            billing_setups.append(setup)
-            if bs.payments_account:
-                payments_accounts_set.add(bs.payments_account)
+        health_log.debug("Starting for customer: %s", customer_id)
+        health_log.debug("MCC: %s", mcc_id)
 
-        # 3) Account budgets
-        account_budgets = []
+        # Billing setups and account budgets do not depend on the customer
+        # row, so both streams run on the pool while it is read here.
         query_budget = """
             SELECT
               account_budget.id,
@@ -1128,39 +1859,71 @@ def debug_account_health():
             FROM account_budget
             ORDER BY account_budget.id
         """
-        print("[DEBUG-HEALTH] Query account budgets...")
-        resp_budget = ga_service.search(customer_id=customer_id, query=query_budget)
-        for row in resp_budget:
-            ab = row.account_budget
-            budget = {
-                "id": ab.id,
-                "resource_name": ab.resource_name,
-                "status": ab.status.name,
-                "approved_spending_limit_micros": ab.approved_spending_limit_micros,
-                "proposed_spending_limit_micros": ab.proposed_spending_limit_micros,
-                "approved_start_date_time": ab.approved_start_date_time,
-                "approved_end_date_time": ab.approved_end_date_time,
-            }
-            account_budgets.append(budget)
+        health_log.debug("Query billing setups and account budgets...")
+        billing_future = _submit(
+            _rows_to_dicts,
+            customer_id,
+            _BILLING_SETUPS_QUERY,
+            "billing_setup",
+            _BILLING_SETUP_KEYS,
+            _BILLING_SETUP_FIELDS,
+            _enum_names(client, "BillingSetupStatusEnum"),
+        )
+        budget_future = _submit(
+            _rows_to_dicts,
+            customer_id,
+            query_budget,
+            "account_budget",
+            _ACCOUNT_BUDGET_KEYS,
+            _ACCOUNT_BUDGET_FIELDS,
+            _enum_names(client, "AccountBudgetStatusEnum"),
+        )
 
-        # 4) Current spend
-        metrics_query = """
+        # 1) Customer info + current spend (both FROM customer, one round-trip)
+        query_customer = f"""
             SELECT
-                customer.currency_code,
-                metrics.cost_micros
+              customer.id,
+              customer.descriptive_name,
+              customer.currency_code,
+              customer.time_zone,
+              customer.manager,
+              customer.test_account,
+              metrics.cost_micros
             FROM customer
+            WHERE customer.id = {customer_id}
         """
-        print("[DEBUG-HEALTH] Query current spend...")
-        metrics_resp = ga_service.search(customer_id=customer_id, query=metrics_query)
+        health_log.debug("Query customer info and current spend...")
+        row = _first_row(customer_id, query_customer)
+        if row is None:
+            # Invalid or inaccessible customer: drop the other reads if they
+            # have not started; running ones finish within their deadline.
+            billing_future.cancel()
+            budget_future.cancel()
+            return jsonify({
+                "success": False,
+                "errors": [f"customer_id {customer_id} not accessible"]
+            }), 404
+
+        c = row.customer
+        customer_info = {
+            "id": c.id,
+            "name": c.descriptive_name,
+            "currency_code": c.currency_code,
+            "time_zone": c.time_zone,
+            "is_manager": c.manager,
+            "is_test_account": c.test_account,
+        }
+        total_spend_micros = row.metrics.cost_micros
+        currency = c.currency_code
 
-        total_spend_micros = 0
-        currency = customer_info.get("currency_code", "USD")
-        for row in metrics_resp:
-            total_spend_micros = row.metrics.cost_micros
-            currency = row.customer.currency_code
-            break
+        # 2) Billing setups and 3) account budgets, started above
+        billing_setups = billing_future.result()
+        payments_accounts = list(dict.fromkeys(
+            setup["payments_account"] for setup in billing_setups if setup["payments_account"]
+        ))
+        account_budgets = budget_future.result()
 
-        print("[DEBUG-HEALTH] SUCCESS\n")
+        health_log.debug("SUCCESS")
 
         return jsonify({
             "success": True,
@@ -1169,14 +1932,14 @@ def debug_account_health():
             "customer_info": customer_info,
             "billing_setups_count": len(billing_setups),
             "billing_setups": billing_setups,
-            "payments_accounts": list(payments_accounts_set),
-            "payments_accounts_count": len(payments_accounts_set),
+            "payments_accounts": payments_accounts,
+            "payments_accounts_count": len(payments_accounts),
             "account_budgets_count": len(account_budgets),
             "account_budgets": account_budgets,
             "total_spend": total_spend_micros / 1e6,
             "total_spend_micros": total_spend_micros,
             "currency": currency,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _now_iso()
         }), 200
 
     except GoogleAdsException as e:
@@ -1186,34 +1949,36 @@ def debug_account_health():
                 "error_code": str(err.error_code),
                 "message": err.message
             })
-        print(f"[DEBUG-HEALTH] GoogleAdsException: {error_details}")
-        return jsonify({"success": False, "errors": error_details}), 400
+        health_log.error("GoogleAdsException: %s", error_details)
+        return error_response(e, {"success": False, "errors": error_details}, 400)
 
     except Exception as e:
-        print(f"[DEBUG-HEALTH] EXCEPTION: {str(e)}")
-        return jsonify({"success": False, "errors": [str(e)]}), 500
+        health_log.error("EXCEPTION: %s", e)
+        return error_response(e, {"success": False, "errors": [str(e)]}, 500)
 
 
 # ============================================================================
 # ENDPOINT 4: ASSIGN BILLING SETUP
 # ============================================================================
 
-from datetime import datetime, timedelta
+assign_billing_log = _tagged_logger("ASSIGN_BILLING")
+
 
 @app.route('/assign-billing-setup', methods=['POST'])
+@idempotent
 def assign_billing_setup():
     """
     POST /assign-billing-setup
     """
-    data = request.json or {}
-    customer_id = str(data.get('customer_id', '')).strip()
+    data = request.get_json(silent=True, cache=True) or {}
+    customer_id = _parse_customer_id(data.get('customer_id'))
 
-    if not customer_id or not customer_id.isdigit():
+    if customer_id is None:
         return jsonify({"success": False, "errors": ["Valid numeric customer_id required."]}), 400
 
-    # 1) Read envs
-    mcc_payments_resource = os.getenv("MCC_PAYMENTS_ACCOUNT_RESOURCE", "").strip()
-    child_payments_id = os.getenv("CHILD_PAYMENTS_ACCOUNT_ID", "").strip()
+    # 1) Payments account config (resolved at startup)
+    mcc_payments_resource = MCC_PAYMENTS_ACCOUNT_RESOURCE
+    child_payments_id = CHILD_PAYMENTS_ACCOUNT_ID
 
     if not mcc_payments_resource and not child_payments_id:
         return jsonify({
@@ -1225,13 +1990,34 @@ def assign_billing_setup():
         }), 500
 
     try:
-        client, mcc_customer_id = load_google_ads_client()
-        billing_setup_service = client.get_service("BillingSetupService")
-        ga_service = client.get_service("GoogleAdsService")
+        client, mcc_customer_id = get_ads_client()
+        billing_setup_service = get_ads_service("BillingSetupService")
+
+        # 2) If MCC-level payments account is configured, prefer that
+        if mcc_payments_resource:
+            payments_account_resource = mcc_payments_resource
+        else:
+            payments_account_resource = (
+                f"customers/{customer_id}/paymentsAccounts/{child_payments_id}"
+            )
+
+        # The billing setup for this payments_account (if any) is read on the
+        # pool while the customer status is checked here; consumed in step 3.
+        check_query = f"""
+            SELECT
+              billing_setup.resource_name,
+              billing_setup.payments_account,
+              billing_setup.status
+            FROM billing_setup
+            WHERE billing_setup.payments_account = '{payments_account_resource}'
+            LIMIT 1
+        """
+        check_future = _submit(_first_row, customer_id, check_query)
 
         # 1a) Block suspended / canceled / closed customers
         ok, status, name = ensure_customer_active(client, customer_id)
         if not ok:
+            check_future.cancel()
             return jsonify({
                 "success": False,
                 "errors": [
@@ -1241,36 +2027,17 @@ def assign_billing_setup():
                 "customer_status": status,
             }), 400
 
-        print("\n[ASSIGN_BILLING] Starting...")
-        print(f"[ASSIGN_BILLING] MCC login_customer_id: {mcc_customer_id}")
-        print(f"[ASSIGN_BILLING] Target child customer_id: {customer_id}")
-        print(f"[ASSIGN_BILLING] MCC_PAYMENTS_ACCOUNT_RESOURCE: {mcc_payments_resource or 'NONE'}")
-        print(f"[ASSIGN_BILLING] CHILD_PAYMENTS_ACCOUNT_ID: {child_payments_id or 'NONE'}")
+        assign_billing_log.debug("Starting...")
+        assign_billing_log.debug("MCC login_customer_id: %s", mcc_customer_id)
+        assign_billing_log.debug("Target child customer_id: %s", customer_id)
+        assign_billing_log.debug("MCC_PAYMENTS_ACCOUNT_RESOURCE: %s", mcc_payments_resource or 'NONE')
+        assign_billing_log.debug("CHILD_PAYMENTS_ACCOUNT_ID: %s", child_payments_id or 'NONE')
 
-        # 2) If MCC-level payments account is configured, prefer that
-        if mcc_payments_resource:
-            payments_account_resource = mcc_payments_resource
-        else:
-            payments_account_resource = (
-                f"customers/{customer_id}/paymentsAccounts/{child_payments_id}"
-            )
-
-        print(f"[ASSIGN_BILLING] Using payments_account: {payments_account_resource}")
+        assign_billing_log.debug("Using payments_account: %s", payments_account_resource)
 
         # 3) Check if a billing setup already exists using this payments_account
-        check_query = """
-            SELECT
-              billing_setup.resource_name,
-              billing_setup.payments_account,
-              billing_setup.status
-            FROM billing_setup
-        """
-        existing = None
-        for row in ga_service.search(customer_id=customer_id, query=check_query):
-            bs = row.billing_setup
-            if bs.payments_account == payments_account_resource:
-                existing = bs
-                break
+        existing_row = check_future.result()
+        existing = existing_row.billing_setup if existing_row else None
 
         if existing:
             return jsonify({
@@ -1285,19 +2052,22 @@ def assign_billing_setup():
             }), 200
 
         # 4) Create new billing setup
-        operation = client.get_type("BillingSetupOperation")
+        operation = _get_type(client, "BillingSetupOperation")
         billing_setup = operation.create
         billing_setup.payments_account = payments_account_resource
-        billing_setup.start_time_type = client.enums.TimeTypeEnum.NOW
+        billing_setup.start_time_type = _get_enum(client, "TimeTypeEnum").NOW
 
-        print("[ASSIGN_BILLING] Calling mutate_billing_setup...")
-        response = billing_setup_service.mutate_billing_setup(
+        assign_billing_log.debug("Calling mutate_billing_setup...")
+        response = mutate_once(
+            billing_setup_service.mutate_billing_setup,
             customer_id=customer_id,
-            operation=operation
+            operation=operation,
+            timeout=mutate_timeout(),
         )
 
         new_resource = response.result.resource_name
-        print(f"[ASSIGN_BILLING] SUCCESS: {new_resource}")
+        assign_billing_log.info("SUCCESS: %s", new_resource)
+        invalidate_customer_caches(customer_id)
 
         return jsonify({
             "success": True,
@@ -1317,419 +2087,713 @@ def assign_billing_setup():
                 "error_code": str(err.error_code),
                 "message": err.message
             })
-        print(f"[ASSIGN_BILLING] GoogleAdsException: {error_details}")
-        return jsonify({"success": False, "errors": error_details}), 400
+        assign_billing_log.error("GoogleAdsException: %s", error_details)
+        return error_response(e, {"success": False, "errors": error_details}, 400)
 
     except Exception as e:
-        print(f"[ASSIGN_BILLING] Exception: {str(e)}")
-        return jsonify({"success": False, "errors": [str(e)]}), 500
+        assign_billing_log.error("Exception: %s", e)
+        if isinstance(e, MutateOutcomeUnknown):
+            return jsonify({"success": False, "outcome_unknown": True, "errors": [str(e)]}), 502
+        return error_response(e, {"success": False, "errors": [str(e)]}, 500)
+
+
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+# Mutating endpoints run off the request thread when the body carries
+# "async": true. They answer 202 with a job_id straight away; the outcome
+# (the JSON and status the synchronous call would have returned) is kept
+# for JOB_RESULT_TTL seconds and read back through /job-status.
+JOB_RESULT_TTL = 15 * 60
+
+_JOBS_EXEC = ThreadPoolExecutor(max_workers=8, thread_name_prefix="job")
+_jobs_lock = threading.Lock()
+_jobs = TTLCache(maxsize=4096, ttl=JOB_RESULT_TTL)
 
 
+def _run_job(fn):
+    with app.app_context():
+        response, status = fn()
+        return response.get_json(), status
 
 
+def run_or_enqueue(data, fn):
+    """Return fn() now, or queue it and answer 202 if the body asked for "async": true."""
+    if data.get("async") is not True:
+        return fn()
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        _jobs[job_id] = _JOBS_EXEC.submit(_run_job, fn)
+    return jsonify({"success": True, "job_id": job_id, "status": "queued"}), 202
 
 
+@app.route('/job-status', methods=['GET'])
+def job_status():
+    """GET /job-status?id=XXXX - Poll a job started with "async": true."""
+    job_id = request.args.get('id', '').strip()
+    with _jobs_lock:
+        future = _jobs.get(job_id)
+    if future is None:
+        return jsonify({"success": False, "errors": ["Unknown or expired job id."]}), 404
+
+    if not future.done():
+        status = "running" if future.running() else "queued"
+        return jsonify({"success": True, "job_id": job_id, "status": status}), 200
+
+    try:
+        result, result_status = future.result()
+    except Exception as e:
+        return jsonify({"success": False, "job_id": job_id, "status": "failed", "errors": [str(e)]}), 200
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "status": "finished",
+        "result_status": result_status,
+        "result": result,
+    }), 200
+
 
 @app.route('/update-email', methods=['POST'])
 def update_email():
     """POST /update-email - Update dashboard access email."""
-    data = request.json or {}
-    customer_id = str(data.get('customer_id', '')).strip()
+    data = request.get_json(silent=True, cache=True) or {}
+    customer_id = _parse_customer_id(data.get('customer_id'))
     email = data.get('email', '').strip()
 
-    if not customer_id or not customer_id.isdigit():
+    if customer_id is None:
         return jsonify({"success": False, "errors": ["Valid numeric customer_id is required."]}), 400
-    if not email or not re.match(r"^[^@]+@[^@]+\.[^@]+$", email):
+    if not _EMAIL_RE.match(email):
         return jsonify({"success": False, "errors": ["Valid email is required."]}), 400
 
-    for attempt in range(3):
-        try:
-            client, _ = load_google_ads_client()
-            ga_service = client.get_service("GoogleAdsService")
+    def _call():
+        client, _ = get_ads_client()
 
-            query = """
-                SELECT
-                    customer_user_access.resource_name,
-                    customer_user_access.email_address,
-                    customer_user_access.access_role
-                FROM customer_user_access
-            """
-            response = ga_service.search(customer_id=customer_id, query=query)
-
-            found_access = None
-            for row in response:
-                if row.customer_user_access.access_role.name == "READ_ONLY":
-                    found_access = row.customer_user_access
-                    break
-
-            if found_access:
-                cua_service = client.get_service("CustomerUserAccessService")
-                operation = client.get_type("CustomerUserAccessOperation")
-                operation.remove = found_access.resource_name
-                cua_service.mutate_customer_user_access(customer_id=customer_id, operation=operation)
-
-            invitation_service = client.get_service("CustomerUserAccessInvitationService")
-            invitation_operation = client.get_type("CustomerUserAccessInvitationOperation")
-            invitation = invitation_operation.create
-            invitation.email_address = email
-            invitation.access_role = "READ_ONLY"
-            invitation_service.mutate_customer_user_access_invitation(
+        query = """
+            SELECT
+                customer_user_access.resource_name,
+                customer_user_access.email_address,
+                customer_user_access.access_role
+            FROM customer_user_access
+            WHERE customer_user_access.access_role = 'READ_ONLY'
+            LIMIT 1
+        """
+        row = _first_row(customer_id, query)
+        found_access = row.customer_user_access if row else None
+
+        if found_access:
+            cua_service = get_ads_service("CustomerUserAccessService")
+            operation = _get_type(client, "CustomerUserAccessOperation")
+            operation.remove = found_access.resource_name
+            # A replay would re-run the LIMIT 1 read above and could remove
+            # a different READ_ONLY user, so the removal is sent only once.
+            mutate_once(
+                cua_service.mutate_customer_user_access,
                 customer_id=customer_id,
-                operation=invitation_operation
+                operation=operation,
+                timeout=mutate_timeout(),
             )
 
-            return jsonify({
-                "success": True,
-                "customer_id": customer_id,
-                "email": email,
-                "message": f"Email updated to {email}. Invitation sent.",
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            }), 200
+        invitation_service = get_ads_service("CustomerUserAccessInvitationService")
+        invitation_operation = _get_type(client, "CustomerUserAccessInvitationOperation")
+        invitation = invitation_operation.create
+        invitation.email_address = email
+        invitation.access_role = "READ_ONLY"
+        mutate_once(
+            invitation_service.mutate_customer_user_access_invitation,
+            customer_id=customer_id,
+            operation=invitation_operation,
+            timeout=mutate_timeout(),
+        )
+
+        return jsonify({
+            "success": True,
+            "customer_id": customer_id,
+            "email": email,
+            "message": f"Email updated to {email}. Invitation sent.",
+            "timestamp": _now_iso()
+        }), 200
 
+    def _run():
+        try:
+            return retry_rpc(_call)
         except Exception as e:
+            if isinstance(e, MutateOutcomeUnknown):
+                return jsonify({"success": False, "outcome_unknown": True, "errors": [str(e)]}), 502
             if is_network_error(e):
-                if attempt < 2:
-                    time.sleep(5)
-                    continue
                 return jsonify({"success": False, "errors": ["Network error. Please try again.", str(e)]}), 500
-            return jsonify({"success": False, "errors": [str(e)]}), 400
-    return jsonify({"success": False, "errors": ["Max retries reached."]}), 500
+            return error_response(e, {"success": False, "errors": [str(e)]}, 400)
+
+    return run_or_enqueue(data, _run)
+
+
+# ============================================================================
+# SOFT CAPS
+# ============================================================================
+
+soft_cap_log = _tagged_logger("SOFT-CAP")
+
+# Each customer's soft cap lives in Mongo. approve-topup hands the upsert
+# to a single writer thread (so writes land in order), waits for it and
+# reports whether it was stored. The pause check reads the cap back,
+# briefly cached: several workers each keep their own cache, so a topup on
+# one must reach the others within seconds. Stored caps only are cached; a
+# customer without one gets the old $10 default.
+#
+# A cap that could not be stored stays in _pending_soft_caps and is
+# retried with backoff until Mongo takes it. Until then it overrides the
+# cached and stored caps in this process, so the old, lower cap (or the
+# default) never comes back here once the 5 s cache entry expires.
+SOFT_CAP_CACHE_TTL = 5
+DEFAULT_SOFT_CAP_MICROS = 10_000_000
+# Seconds a soft-cap read or write may spend on Mongo, server selection
+# included; pymongo would otherwise wait 30 s for an unreachable server.
+SOFT_CAP_DB_TIMEOUT = 2.0
+# Backoff between retries of a soft-cap write that failed (seconds).
+SOFT_CAP_RETRY_BASE = 1.0
+SOFT_CAP_RETRY_MAX = 60.0
+
+_soft_caps = TTLCache(maxsize=4096, ttl=SOFT_CAP_CACHE_TTL)
+# customer_id -> cap in micros, set until the cap is in Mongo (guarded by _cache_lock).
+_pending_soft_caps = {}
+_SOFT_CAP_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="soft-cap")
+
+
+def _write_soft_cap(customer_id, retry_delay=SOFT_CAP_RETRY_BASE):
+    """
+    Write `customer_id`'s pending soft cap to Mongo (runs on _SOFT_CAP_WRITER).
+
+    Always writes the latest pending cap, so a retry never puts back an
+    older one. On failure the write is queued again after `retry_delay`.
+    """
+    with _cache_lock:
+        cap_micros = _pending_soft_caps.get(customer_id)
+    if cap_micros is None:
+        return True
+    try:
+        with app.app_context(), pymongo.timeout(SOFT_CAP_DB_TIMEOUT):
+            get_soft_caps_collection().update_one(
+                {"customer_id": customer_id},
+                {"$set": {"customer_id": customer_id, "soft_cap_micros": cap_micros, "updated_at": _now_iso()}},
+                upsert=True,
+            )
+    except Exception as e:
+        soft_cap_log.error(
+            "Failed to store soft cap for customer %s, retrying in %.0fs: %s", customer_id, retry_delay, e
+        )
+        retry = threading.Timer(
+            retry_delay,
+            _SOFT_CAP_WRITER.submit,
+            (_write_soft_cap, customer_id, min(retry_delay * 2, SOFT_CAP_RETRY_MAX)),
+        )
+        retry.daemon = True
+        retry.start()
+        return False
+    with _cache_lock:
+        if _pending_soft_caps.get(customer_id) == cap_micros:
+            del _pending_soft_caps[customer_id]
+    return True
+
+
+def set_soft_cap(customer_id, cap_micros):
+    """
+    Set `customer_id`'s soft cap and write it to Mongo.
+
+    Returns True once it is stored; False if the write failed or is still
+    queued, in which case it keeps being retried in the background.
+    """
+    with _cache_lock:
+        _soft_caps[customer_id] = cap_micros
+        _pending_soft_caps[customer_id] = cap_micros
+    future = _SOFT_CAP_WRITER.submit(_write_soft_cap, customer_id)
+    try:
+        return future.result(timeout=2 * SOFT_CAP_DB_TIMEOUT)
+    except FutureTimeoutError:
+        return False
+
+
+def _load_soft_cap(customer_id):
+    with pymongo.timeout(SOFT_CAP_DB_TIMEOUT):
+        doc = get_soft_caps_collection().find_one({"customer_id": customer_id}, {"soft_cap_micros": 1})
+    return doc["soft_cap_micros"] if doc else None
+
+
+def get_soft_cap(customer_id):
+    """
+    Return `customer_id`'s soft cap in micros.
+
+    Raises if Mongo cannot be read; callers must not fall back to the
+    default then, or an outage would look like a $10 cap.
+    """
+    with _cache_lock:
+        cap_micros = _pending_soft_caps.get(customer_id)
+        if cap_micros is None:
+            cap_micros = _soft_caps.get(customer_id)
+    if cap_micros is not None:
+        return cap_micros
+    cap_micros = _singleflight(("soft-cap", customer_id), _load_soft_cap, customer_id)
+    if cap_micros is None:
+        return DEFAULT_SOFT_CAP_MICROS
+    _cache_put(_soft_caps, customer_id, cap_micros)
+    return cap_micros
+
+
+topup_log = _tagged_logger("TOPUP")
+
+
+def _notes_update(topup_amount, currency, new_limit_micros):
+    return (
+        f"Updated via /approve-topup. "
+        f"Increment: {topup_amount} {currency}. "
+        f"New limit: {new_limit_micros / 1e6:.2f} {currency}."
+    )
+
+
+def _notes_create(topup_amount, currency):
+    return (
+        f"Created via /approve-topup. "
+        f"Initial limit: {topup_amount} {currency}."
+    )
+
 
 @app.route('/approve-topup', methods=['POST'])
+@idempotent
 def approve_topup():
     """
     POST /approve-topup
     """
-    data = request.json or {}
-    customer_id = str(data.get('customer_id', '')).strip()
+    data = request.get_json(silent=True, cache=True) or {}
+    customer_id = _parse_customer_id(data.get('customer_id'))
     topup_amount = data.get('topup_amount')
+    topup_micros = data.get('topup_amount_micros')
 
+    # Money is converted to micros with integer/Decimal math only: as a
+    # float, 0.29 * 1_000_000 is 289999.99999999994 and int() drops a micro.
     errors = []
-    if not customer_id or not customer_id.isdigit():
+    if customer_id is None:
         errors.append("Valid numeric customer_id is required.")
-    if topup_amount is None:
+    if topup_micros is not None:
+        if type(topup_micros) is not int or topup_micros <= 0:
+            errors.append("topup_amount_micros must be a positive integer.")
+        else:
+            topup_amount = topup_micros / 1e6
+    elif topup_amount is None:
         errors.append("topup_amount is required.")
     else:
         try:
-            topup_amount = float(topup_amount)
-            if topup_amount <= 0:
+            amount = Decimal(str(topup_amount))
+            if not amount.is_finite():
+                raise ValueError(topup_amount)
+            topup_micros = int((amount * 1_000_000).to_integral_value(rounding=ROUND_HALF_UP))
+            topup_amount = float(amount)
+            if topup_micros <= 0:
                 errors.append("topup_amount must be greater than 0.")
-        except (ValueError, TypeError):
+        except (InvalidOperation, ValueError):
             errors.append("topup_amount must be a valid number.")
 
     if errors:
         return jsonify({"success": False, "errors": errors}), 400
 
-    topup_micros = int(topup_amount * 1_000_000)
+    # ?dry_run=1: the server validates the proposal (validate_only) but
+    # nothing is created or changed.
+    dry_run = request.args.get("dry_run") == "1"
 
-    for attempt in range(3):
-        try:
-            client, _ = load_google_ads_client()
-            ga_service = client.get_service("GoogleAdsService")
-            proposal_service = client.get_service("AccountBudgetProposalService")
+    def _call():
+        client, _ = get_ads_client()
+        proposal_service = get_ads_service("AccountBudgetProposalService")
 
-            # 0) Block suspended / canceled / closed customers
-            ok, status, name = ensure_customer_active(client, customer_id)
-            if not ok:
-                return jsonify({
-                    "success": False,
-                    "errors": [
-                        f"Customer {customer_id} ({name}) has status {status}. "
-                        "Topups and account budgets are only allowed for ENABLED accounts."
-                    ],
-                    "customer_status": status,
-                }), 400
-
-            # 1) Get account currency
-            customer_query = """
-                SELECT
-                  customer.currency_code
-                FROM customer
-                LIMIT 1
-            """
-            customer_response = ga_service.search(customer_id=customer_id, query=customer_query)
-            customer_currency = None
-            for row in customer_response:
-                customer_currency = row.customer.currency_code
-                break
+        customer_query = """
+            SELECT
+              customer.currency_code
+            FROM customer
+            LIMIT 1
+        """
+        billing_query = """
+            SELECT
+              billing_setup.id,
+              billing_setup.resource_name,
+              billing_setup.status
+            FROM billing_setup
+            WHERE billing_setup.status IN ('APPROVED_HELD', 'APPROVED')
+            ORDER BY billing_setup.id
+            LIMIT 1
+        """
+        # account_budget rows carry the attributed customer resource, so one
+        # read returns both the budget and the account currency.
+        budget_query = """
+            SELECT
+              customer.currency_code,
+              account_budget.id,
+              account_budget.resource_name,
+              account_budget.status,
+              account_budget.approved_spending_limit_micros,
+              account_budget.proposed_spending_limit_micros
+            FROM account_budget
+            ORDER BY account_budget.id
+            LIMIT 1
+        """
+        # The budget (with currency) is read on the pool while the customer
+        # status is checked here. Only a customer with no budget yet needs
+        # the billing setup (to CREATE one) and a separate currency read.
+        budget_future = _submit(_first_row, customer_id, budget_query)
 
-            if not customer_currency:
-                return jsonify({
-                    "success": False,
-                    "errors": ["Unable to determine account currency."]
-                }), 400
+        # 0) Block suspended / canceled / closed customers
+        ok, status, name = ensure_customer_active(client, customer_id)
+        if not ok:
+            budget_future.cancel()
+            return jsonify({
+                "success": False,
+                "errors": [
+                    f"Customer {customer_id} ({name}) has status {status}. "
+                    "Topups and account budgets are only allowed for ENABLED accounts."
+                ],
+                "customer_status": status,
+            }), 400
 
-            # 2) Find a usable billing setup (APPROVED_HELD / APPROVED / ACTIVE)
-            billing_query = """
-                SELECT
-                  billing_setup.id,
-                  billing_setup.resource_name,
-                  billing_setup.status
+        # 1) Check if an account_budget already exists, and get account currency
+        existing_budget = None
+        billing_future = None
+        budget_row = budget_future.result()
+        if budget_row is not None:
+            existing_budget = budget_row.account_budget
+            customer_currency = budget_row.customer.currency_code
+            topup_log.debug("Found existing account_budget: id=%s", existing_budget.id)
+        else:
+            billing_future = _submit(_first_row, customer_id, billing_query)
+            customer_currency = _cache_get(_currency_cache, customer_id)
+            if customer_currency is None:
+                try:
+                    customer_row = _first_row(customer_id, customer_query)
+                except Exception:
+                    billing_future.cancel()
+                    raise
+                customer_currency = customer_row.customer.currency_code if customer_row else None
+        if customer_currency:
+            _cache_put(_currency_cache, customer_id, customer_currency)
+
+        if not customer_currency:
+            if billing_future is not None:
+                billing_future.cancel()
+            return jsonify({
+                "success": False,
+                "errors": ["Unable to determine account currency."]
+            }), 400
+
+        # 2) Without a budget, find a usable billing setup (APPROVED_HELD / APPROVED)
+        billing_setup_resource = None
+        billing_status = None
+
+        billing_row = billing_future.result() if billing_future is not None else None
+        if billing_row is not None:
+            billing_setup_resource = billing_row.billing_setup.resource_name
+            billing_status = billing_row.billing_setup.status.name
+            topup_log.debug("Billing setup: id=%s, status=%s", billing_row.billing_setup.id, billing_status)
+
+        if not existing_budget and not billing_setup_resource:
+            # Error path only: report the status of the setup that is there.
+            latest_row = _first_row(customer_id, """
+                SELECT billing_setup.status
                 FROM billing_setup
                 ORDER BY billing_setup.id
-            """
-            billing_setup_resource = None
-            billing_status = None
+                LIMIT 1
+            """)
+            if latest_row is not None:
+                billing_status = latest_row.billing_setup.status.name
+            msg = (
+                f"No usable billing setup found. Latest status: {billing_status or 'NONE'}. "
+                f"Billing setup must be APPROVED_HELD or APPROVED before approving topups."
+            )
+            return jsonify({
+                "success": False,
+                "errors": [msg]
+            }), 400
 
-            for row in ga_service.search(customer_id=customer_id, query=billing_query):
-                status_name = row.billing_setup.status.name
-                print(f"[TOPUP] Billing setup: id={row.billing_setup.id}, status={status_name}")
+        operation = _get_type(client, "AccountBudgetProposalOperation")
+        proposal = operation.create
+        proposal_type_enum = _get_enum(client, "AccountBudgetProposalTypeEnum")
+        time_type_enum = _get_enum(client, "TimeTypeEnum")
 
-                if status_name in ("APPROVED_HELD", "APPROVED", "ACTIVE"):
-                    billing_setup_resource = row.billing_setup.resource_name
-                    billing_status = status_name
-                    break
+        new_spending_limit_micros = None
+        soft_cap_stored = None
+        proposal_id = None
+        account_budget_proposal_resource = None
 
-                if billing_status is None:
-                    billing_status = status_name
+        if existing_budget:
+            current_limit = (
+                existing_budget.proposed_spending_limit_micros
+                or existing_budget.approved_spending_limit_micros
+            )
+            if current_limit is None or current_limit == 0:
+                new_spending_limit_micros = topup_micros
+            else:
+                new_spending_limit_micros = current_limit + topup_micros
 
-            if not billing_setup_resource:
-                msg = (
-                    f"No usable billing setup found. Latest status: {billing_status or 'NONE'}. "
-                    f"Billing setup must be APPROVED_HELD, APPROVED, or ACTIVE before approving topups."
-                )
-                return jsonify({
-                    "success": False,
-                    "errors": [msg]
-                }), 400
+            proposal.proposal_type = proposal_type_enum.UPDATE
+            proposal.account_budget = existing_budget.resource_name
+            proposal.proposed_spending_limit_micros = new_spending_limit_micros
+            operation.update_mask.paths.append("proposed_spending_limit_micros")
+            operation.update_mask.paths.append("proposed_notes")
 
-            # 3) Check if an account_budget already exists
-            budget_query = """
-                SELECT
-                  account_budget.id,
-                  account_budget.resource_name,
-                  account_budget.status,
-                  account_budget.approved_spending_limit_micros,
-                  account_budget.proposed_spending_limit_micros
-                FROM account_budget
-                ORDER BY account_budget.id
-            """
-            budget_response = ga_service.search(customer_id=customer_id, query=budget_query)
-            existing_budget = None
-            for row in budget_response:
-                existing_budget = row.account_budget
-                print(f"[TOPUP] Found existing account_budget: id={existing_budget.id}")
-                break
-
-            operation = client.get_type("AccountBudgetProposalOperation")
-            proposal = operation.create
-            proposal_type_enum = client.enums.AccountBudgetProposalTypeEnum
-            time_type_enum = client.enums.TimeTypeEnum
-
-            new_spending_limit_micros = None
-            proposal_id = None
-            account_budget_proposal_resource = None
-
-            if existing_budget:
-                current_limit = (
-                    existing_budget.proposed_spending_limit_micros
-                    or existing_budget.approved_spending_limit_micros
-                )
-                if current_limit is None or current_limit == 0:
-                    new_spending_limit_micros = topup_micros
-                else:
-                    new_spending_limit_micros = current_limit + topup_micros
-
-                proposal.proposal_type = proposal_type_enum.UPDATE
-                proposal.account_budget = existing_budget.resource_name
-                proposal.proposed_spending_limit_micros = new_spending_limit_micros
-                proposal.proposed_notes = (
-                    f"Updated via /approve-topup. "
-                    f"Increment: {topup_amount} {customer_currency}. "
-                    f"New limit: {new_spending_limit_micros / 1e6:.2f} {customer_currency}."
-                )
-                operation.update_mask.paths.append("proposed_spending_limit_micros")
-                operation.update_mask.paths.append("proposed_notes")
+        else:
+            new_spending_limit_micros = topup_micros
+            proposal.proposal_type = proposal_type_enum.CREATE
+            proposal.billing_setup = billing_setup_resource
+            proposal.proposed_spending_limit_micros = new_spending_limit_micros
+            proposal.proposed_name = f"Top-up budget: {topup_amount} {customer_currency}"
+            proposal.proposed_start_time_type = time_type_enum.NOW
+            proposal.proposed_end_time_type = time_type_enum.FOREVER
+
+        # Notes are formatted only once the CREATE/UPDATE branch is settled.
+        if existing_budget:
+            proposal.proposed_notes = _notes_update(topup_amount, customer_currency, new_spending_limit_micros)
+        else:
+            proposal.proposed_notes = _notes_create(topup_amount, customer_currency)
 
+        # 3) Send AccountBudgetProposal
+        mutate_request = _get_type(client, "MutateAccountBudgetProposalRequest")
+        mutate_request.customer_id = customer_id
+        mutate_request.operation = operation
+        mutate_request.validate_only = dry_run
+        try:
+            if dry_run:
+                # validate_only never applies anything, so a replay is harmless.
+                proposal_service.mutate_account_budget_proposal(request=mutate_request, timeout=mutate_timeout())
+                hard_cap_status = "VALIDATED"
             else:
-                new_spending_limit_micros = topup_micros
-                proposal.proposal_type = proposal_type_enum.CREATE
-                proposal.billing_setup = billing_setup_resource
-                proposal.proposed_spending_limit_micros = new_spending_limit_micros
-                proposal.proposed_name = f"Top-up budget: {topup_amount} {customer_currency}"
-                proposal.proposed_notes = (
-                    f"Created via /approve-topup. "
-                    f"Initial limit: {topup_amount} {customer_currency}."
-                )
-                proposal.proposed_start_time_type = time_type_enum.NOW
-                proposal.proposed_end_time_type = time_type_enum.FOREVER
-
-            # 4) Send AccountBudgetProposal
-            try:
-                response = proposal_service.mutate_account_budget_proposal(
-                    customer_id=customer_id,
-                    operation=operation
+                response = mutate_once(
+                    proposal_service.mutate_account_budget_proposal, request=mutate_request, timeout=mutate_timeout()
                 )
                 account_budget_proposal_resource = response.result.resource_name
                 proposal_id = account_budget_proposal_resource.split("/")[-1]
                 hard_cap_status = "PENDING"
-            except GoogleAdsException as e:
-                hard_cap_status = "FAILED"
-                print("===== Hard cap failed =====")
-                print("Customer ID:", customer_id)
-                for error in e.failure.errors:
-                    print("  Error:", error.message)
-
-                return jsonify({
+                invalidate_customer_caches(customer_id)
+                soft_cap_stored = set_soft_cap(customer_id, new_spending_limit_micros)
+        except GoogleAdsException as e:
+            if dry_run:
+                # A transient or auth failure says nothing about the proposal:
+                # leave it to retry_rpc instead of answering "would fail".
+                if is_network_error(e) or is_auth_error(e):
+                    raise
+                # "Would fail" is a successful answer to a dry run, not an error.
+                return error_response(e, {
                     "success": False,
-                    "errors": ["Failed to create/update AccountBudget via AccountBudgetProposal.", str(e)]
-                }), 500
+                    "dry_run": True,
+                    "hard_cap_status": "INVALID",
+                    "errors": [error.message for error in e.failure.errors],
+                }, 200)
+            hard_cap_status = "FAILED"
+            topup_log.error(
+                "Hard cap failed for customer %s: %s",
+                customer_id, [error.message for error in e.failure.errors]
+            )
 
-            return jsonify({
-                "success": True,
-                "customer_id": customer_id,
-                "billing_setup_status": billing_status,
-                "topup_amount": topup_amount,
-                "currency": customer_currency,
-                "topup_micros": topup_micros,
-                "new_spending_limit_micros": new_spending_limit_micros,
-                "new_spending_limit": (new_spending_limit_micros / 1e6) if new_spending_limit_micros else None,
-                "hard_cap_status": hard_cap_status,
-                "hard_cap_proposal_id": proposal_id,
-                "account_budget_proposal_resource": account_budget_proposal_resource,
-                "message": (
-                    f"Topup of {topup_amount} {customer_currency} submitted as "
-                    f"AccountBudgetProposal ({'CREATE' if not existing_budget else 'UPDATE'}). "
-                    f"Status: {hard_cap_status}."
-                ),
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            }), 200
+            return error_response(e, {
+                "success": False,
+                "errors": ["Failed to create/update AccountBudget via AccountBudgetProposal.", str(e)]
+            }, 500)
 
+        return jsonify({
+            "success": True,
+            "dry_run": dry_run,
+            "customer_id": customer_id,
+            "billing_setup_status": billing_status,
+            "topup_amount": topup_amount,
+            "currency": customer_currency,
+            "topup_micros": topup_micros,
+            "new_spending_limit_micros": new_spending_limit_micros,
+            "new_spending_limit": (new_spending_limit_micros / 1e6) if new_spending_limit_micros else None,
+            "hard_cap_status": hard_cap_status,
+            "hard_cap_proposal_id": proposal_id,
+            "account_budget_proposal_resource": account_budget_proposal_resource,
+            # False: the proposal was sent, but the new soft cap is not in the
+            # database yet. It keeps being retried; do not resend the topup.
+            "soft_cap_stored": soft_cap_stored,
+            "warnings": (
+                ["Soft cap not saved yet; it is being retried. Other workers may pause on the old cap until then."]
+                if soft_cap_stored is False else []
+            ),
+            "message": (
+                f"Topup of {topup_amount} {customer_currency} "
+                f"{'validated (dry run, nothing submitted)' if dry_run else 'submitted'} as "
+                f"AccountBudgetProposal ({'CREATE' if not existing_budget else 'UPDATE'}). "
+                f"Status: {hard_cap_status}."
+            ),
+            "timestamp": _now_iso()
+        }), 200
+
+    def _run():
+        try:
+            return retry_rpc(_call)
         except Exception as e:
+            if isinstance(e, MutateOutcomeUnknown):
+                return jsonify({"success": False, "outcome_unknown": True, "errors": [str(e)]}), 502
             if is_network_error(e):
-                if attempt < 2:
-                    time.sleep(5)
-                    continue
                 return jsonify({
                     "success": False,
                     "errors": ["Network error. Please try again later.", str(e)]
                 }), 500
-            return jsonify({"success": False, "errors": [f"Error: {str(e)}"]}), 500
+            return error_response(e, {"success": False, "errors": [f"Error: {str(e)}"]}, 500)
+
+    return run_or_enqueue(data, _run)
+
 
-    return jsonify({"success": False, "errors": ["Max retries reached."]}), 500
+pause_log = _tagged_logger("PAUSE")
 
+# Campaign pauses per mutate_campaigns call; large accounts are split into
+# several requests to stay well inside the per-request operation limit.
+PAUSE_BATCH_SIZE = 1000
+
+# Current spend, read by both the soft-cap check and client-spend-status.
+_SPEND_METRICS_QUERY = """
+    SELECT
+        customer.currency_code,
+        metrics.cost_micros
+    FROM customer
+    LIMIT 1
+"""
 
 
 @app.route('/check-and-pause-campaigns', methods=['POST'])
 def check_and_pause_campaigns():
     """POST /check-and-pause-campaigns - Enforce soft cap by pausing campaigns."""
-    data = request.json or {}
-    customer_id = str(data.get('customer_id', '')).strip()
+    data = request.get_json(silent=True, cache=True) or {}
+    customer_id = _parse_customer_id(data.get('customer_id'))
 
-    if not customer_id or not customer_id.isdigit():
+    if customer_id is None:
         return jsonify({"success": False, "errors": ["Valid numeric customer_id is required."]}), 400
 
-    for attempt in range(3):
-        try:
-            client, _ = load_google_ads_client()
-            ga_service = client.get_service("GoogleAdsService")
-            campaign_service = client.get_service("CampaignService")
+    def _call():
+        client, _ = get_ads_client()
+        campaign_service = get_ads_service("CampaignService")
 
-            # Fetch spend metrics
-            metrics_query = """
+        # Without the stored cap there is nothing to compare against: pausing
+        # on the default would stop every customer past $10 during an outage.
+        try:
+            stored_balance_micros = get_soft_cap(customer_id)
+        except Exception as e:
+            pause_log.error("Soft cap unavailable for customer %s: %s", customer_id, e)
+            return jsonify({
+                "success": False,
+                "campaigns_paused": False,
+                "errors": ["Stored soft cap could not be read; no campaigns were paused.", str(e)],
+            }), 503
+
+        # Fetch spend metrics
+        total_spend_micros = _cache_get(_pause_metrics_cache, customer_id)
+        if total_spend_micros is None:
+            row = _singleflight(("pause-metrics", customer_id), _first_row, customer_id, _SPEND_METRICS_QUERY)
+            total_spend_micros = row.metrics.cost_micros if row else 0
+            _cache_put(_pause_metrics_cache, customer_id, total_spend_micros)
+
+        campaigns_paused = False
+        if total_spend_micros >= stored_balance_micros:
+            # Only the resource name is needed to pause a campaign.
+            campaign_query = """
                 SELECT
-                    customer.currency_code,
-                    metrics.cost_micros
-                FROM customer
+                    campaign.id,
+                    campaign.resource_name
+                FROM campaign
+                WHERE campaign.status = ENABLED
             """
-            metrics_response = ga_service.search(customer_id=customer_id, query=metrics_query)
-            
-            total_spend_micros = 0
-            for row in metrics_response:
-                total_spend_micros = row.metrics.cost_micros
-                break
-
-            # TODO: Fetch stored soft cap from MongoDB
-            stored_balance_micros = 10_000_000  # Placeholder: $10
-
-            campaigns_paused = False
-            if total_spend_micros >= stored_balance_micros:
-                campaign_query = """
-                    SELECT
-                        campaign.id,
-                        campaign.resource_name,
-                        campaign.status,
-                        campaign.name
-                    FROM campaign
-                    WHERE campaign.status = ENABLED
-                """
-                campaign_response = ga_service.search(customer_id=customer_id, query=campaign_query)
-
-                for row in campaign_response:
-                    campaign = row.campaign
-                    operation = client.get_type("CampaignOperation")
-                    operation.update = campaign
-                    operation.update.status = client.enums.CampaignStatusEnum.PAUSED
-                    operation.update_mask.paths.append("status")
-
-                    campaign_service.mutate_campaigns(customer_id=customer_id, operations=[operation])
-                    print(f"[DEBUG] Paused campaign {campaign.id}")
-                    campaigns_paused = True
+            campaign_response = _search_all(customer_id, campaign_query)
+
+            paused = _get_enum(client, "CampaignStatusEnum").PAUSED
+            operations = []
+            campaign_ids = []
+            for row in campaign_response:
+                campaign = row.campaign
+                operation = _get_type(client, "CampaignOperation")
+                operation.update.resource_name = campaign.resource_name
+                operation.update.status = paused
+                operation.update_mask.paths.append("status")
+                operations.append(operation)
+                campaign_ids.append(campaign.id)
+
+            # A few batched mutates instead of one round-trip per campaign.
+            for start in range(0, len(operations), PAUSE_BATCH_SIZE):
+                campaign_service.mutate_campaigns(
+                    customer_id=customer_id,
+                    operations=operations[start:start + PAUSE_BATCH_SIZE],
+                    timeout=mutate_timeout(),
+                )
+            if operations:
+                pause_log.info("Paused campaigns %s on customer %s", campaign_ids, customer_id)
+                campaigns_paused = True
 
-            return jsonify({
-                "success": True,
-                "customer_id": customer_id,
-                "total_spend_micros": total_spend_micros,
-                "stored_balance_micros": stored_balance_micros,
-                "campaigns_paused": campaigns_paused,
-                "message": f"Spend: ${total_spend_micros/1e6:.2f}. Balance: ${stored_balance_micros/1e6:.2f}.",
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            }), 200
+        return jsonify({
+            "success": True,
+            "customer_id": customer_id,
+            "total_spend_micros": total_spend_micros,
+            "stored_balance_micros": stored_balance_micros,
+            "campaigns_paused": campaigns_paused,
+            "message": f"Spend: ${total_spend_micros/1e6:.2f}. Balance: ${stored_balance_micros/1e6:.2f}.",
+            "timestamp": _now_iso()
+        }), 200
 
+    def _run():
+        try:
+            return retry_rpc(_call)
         except Exception as e:
             if is_network_error(e):
-                if attempt < 2:
-                    time.sleep(5)
-                    continue
                 return jsonify({"success": False, "errors": ["Network error. Please try again.", str(e)]}), 500
-            return jsonify({"success": False, "errors": [str(e)]}), 400
-    return jsonify({"success": False, "errors": ["Max retries reached."]}), 500
+            return error_response(e, {"success": False, "errors": [str(e)]}, 400)
+
+    return run_or_enqueue(data, _run)
+
+
+_SPEND_CACHE_HEADERS = {"Cache-Control": f"private, max-age={SPEND_CACHE_TTL}"}
+
 
 @app.route('/client-spend-status', methods=['GET'])
 def client_spend_status():
-    """GET /client-spend-status?customer_id=XXXX - Return real-time spend and balance."""
-    customer_id = request.args.get('customer_id', '').strip()
+    """
+    GET /client-spend-status?customer_id=XXXX - Return real-time spend and balance.
+
+    Results are cached per customer for SPEND_CACHE_TTL seconds (flagged
+    with "cached": true); pass ?refresh=1 to bypass the cache.
+    """
+    customer_id = _parse_customer_id(request.args.get('customer_id'))
 
-    if not customer_id or not customer_id.isdigit():
+    if customer_id is None:
         return jsonify({"success": False, "errors": ["Valid numeric customer_id is required."]}), 400
 
-    for attempt in range(3):
-        try:
-            client, _ = load_google_ads_client()
-            ga_service = client.get_service("GoogleAdsService")
+    if request.args.get("refresh") != "1":
+        cached = _cache_get(_spend_cache, customer_id)
+        if cached is not None:
+            return jsonify({**cached, "cached": True, "timestamp": _now_iso()}), 200, _SPEND_CACHE_HEADERS
 
-            # 1) Fetch spend metrics
-            metrics_query = """
-                SELECT
-                    customer.currency_code,
-                    metrics.cost_micros
-                FROM customer
-            """
-            metrics_response = ga_service.search(customer_id=customer_id, query=metrics_query)
+    def _call():
+        client, _ = get_ads_client()
+
+        budget_query = """
+            SELECT
+                account_budget.approved_spending_limit_micros,
+                account_budget.proposed_spending_limit_micros
+            FROM account_budget
+            ORDER BY account_budget.id DESC
+            LIMIT 1
+        """
+
+        def _fetch():
+            # Both reads are independent; issue them concurrently.
+            metrics_future = _submit(_first_row, customer_id, _SPEND_METRICS_QUERY)
+            budget_future = _submit(_first_row, customer_id, budget_query)
 
+            # 1) Spend metrics
             total_spend_micros = 0
             currency = "USD"
-            for row in metrics_response:
+            row = metrics_future.result()
+            if row is not None:
                 total_spend_micros = row.metrics.cost_micros
                 currency = row.customer.currency_code
-                break
 
-            # 2) Fetch current account budget limit (hard cap)
-            budget_query = """
-                SELECT
-                    account_budget.approved_spending_limit_micros,
-                    account_budget.proposed_spending_limit_micros
-                FROM account_budget
-                ORDER BY account_budget.id DESC
-                LIMIT 1
-            """
+            # 2) Current account budget limit (hard cap)
             topup_balance_micros = 0
-            budget_response = ga_service.search(customer_id=customer_id, query=budget_query)
-            for row in budget_response:
+            row = budget_future.result()
+            if row is not None:
                 approved = row.account_budget.approved_spending_limit_micros
                 proposed = row.account_budget.proposed_spending_limit_micros
                 topup_balance_micros = proposed or approved or 0
-                break
 
             # If no budget found, treat as zero balance
             remaining_balance_micros = max(0, topup_balance_micros - total_spend_micros)
@@ -1738,7 +2802,7 @@ def client_spend_status():
                 if topup_balance_micros > 0 else 0
             )
 
-            return jsonify({
+            status = {
                 "success": True,
                 "customer_id": customer_id,
                 "currency": currency,
@@ -1749,20 +2813,27 @@ def client_spend_status():
                 "remaining_balance": remaining_balance_micros / 1e6,
                 "remaining_balance_micros": remaining_balance_micros,
                 "percentage_used": round(percentage_used, 2),
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            }), 200
+            }
+            _cache_put(_spend_cache, customer_id, status)
+            return status
 
-        except Exception as e:
-            if is_network_error(e):
-                if attempt < 2:
-                    time.sleep(5)
-                    continue
-                return jsonify({"success": False, "errors": ["Network error. Please try again.", str(e)]}), 500
-            return jsonify({"success": False, "errors": [str(e)]}), 400
+        # Concurrent requests for the same customer share one upstream read.
+        status = _singleflight(("spend", customer_id), _fetch)
 
-    return jsonify({"success": False, "errors": ["Max retries reached."]}), 500
+        return jsonify({**status, "cached": False, "timestamp": _now_iso()}), 200, _SPEND_CACHE_HEADERS
+
+    try:
+        return retry_rpc(_call)
+    except Exception as e:
+        if is_network_error(e):
+            return jsonify({"success": False, "errors": ["Network error. Please try again.", str(e)]}), 500
+        return error_response(e, {"success": False, "errors": [str(e)]}, 400)
 
 
 if __name__ == '__main__':
-    
-    app.run(host='0.0.0.0', port=8080, debug=False)
+    # Load the client (and with it the MCC id) now so a bad google-ads.yaml
+    # fails at startup rather than on the first request.
+    get_ads_client()
+    # Handlers block on Google Ads gRPC calls (which release the GIL), so
+    # serve each request on its own thread to overlap that I/O.
+    app.run(host='0.0.0.0', port=8080, debug=False, threaded=True)